@@ -0,0 +1,27 @@
+"""add section asset format
+
+Revision ID: 0003_asset_format
+Revises: 0002_notes
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_asset_format"
+
+down_revision = "0002_notes"
+
+branch_labels = None
+
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("section_assets") as batch_op:
+        batch_op.add_column(sa.Column("format", sa.String(length=16), nullable=False, server_default="png"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("section_assets") as batch_op:
+        batch_op.drop_column("format")
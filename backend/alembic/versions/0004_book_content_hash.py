@@ -0,0 +1,29 @@
+"""add book content hash
+
+Revision ID: 0004_book_content_hash
+Revises: 0003_asset_format
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_book_content_hash"
+
+down_revision = "0003_asset_format"
+
+branch_labels = None
+
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("books") as batch_op:
+        batch_op.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index("ix_books_content_hash", "books", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_books_content_hash", table_name="books")
+    with op.batch_alter_table("books") as batch_op:
+        batch_op.drop_column("content_hash")
@@ -4,6 +4,7 @@ from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models import SectionAsset
+from app.services.image_extraction import IMAGE_MEDIA_TYPES
 
 router = APIRouter()
 
@@ -13,4 +14,5 @@ def get_asset(asset_id: int, db: Session = Depends(get_db)):
     asset = db.get(SectionAsset, asset_id)
     if not asset or not os.path.exists(asset.file_path):
         raise HTTPException(status_code=404, detail="Asset not found")
-    return FileResponse(asset.file_path, media_type="image/png", filename=os.path.basename(asset.file_path))
+    media_type = IMAGE_MEDIA_TYPES.get(asset.format, "image/png")
+    return FileResponse(asset.file_path, media_type=media_type, filename=os.path.basename(asset.file_path))
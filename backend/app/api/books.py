@@ -1,19 +1,26 @@
+import json
 import logging
 import os
 import shutil
 from datetime import datetime
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.api.file_ranges import ranged_file_response
 from app.db.session import get_db
 from app.models import Book, Section, ReadingProgress, Note
 from app.schemas.book import BookOut, BookUpdate
 from app.schemas.section import SectionTree
 from app.schemas.progress import ProgressOut, ProgressUpdate
-from app.services.pdf_ingestion import save_pdf_file
+from app.schemas.summary import SummaryGenerateResponse
+from app.services.pdf_ingestion import discard_upload, save_pdf_upload, store_pdf_file
+from app.services.section_index import invalidate_page_index
+from app.services.page_text_store import delete_page_texts
+from app.services.prefetch import prefetch_for_page
 from app.services.section_tree_builder import build_tree
-from app.workers.rq_queue import get_queue
+from app.workers.rq_queue import book_summary_progress_key, enqueue_once, get_redis
 from app.workers import tasks
 
 logger = logging.getLogger(__name__)
@@ -23,21 +30,59 @@ _summary_clicks: dict[int, dict] = {}
 
 
 @router.post("/books", response_model=BookOut)
-async def upload_book(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_book(
+    file: UploadFile = File(...),
+    force_reingest: bool = Query(False),
+    db: Session = Depends(get_db),
+):
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
-    content = await file.read()
-    book = Book(title=file.filename, file_path="")
-    db.add(book)
-    db.flush()
-    file_path = save_pdf_file(book.id, file.filename, content)
-    book.file_path = file_path
-    db.commit()
+    try:
+        tmp_path, content_hash, size = await save_pdf_upload(file)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return await run_in_threadpool(_register_upload, db, tmp_path, content_hash, size, file.filename, force_reingest)
+
+
+def _register_upload(
+    db: Session, tmp_path: str, content_hash: str, size: int, filename: str, force_reingest: bool
+) -> Book:
+    if not force_reingest:
+        existing = db.query(Book).filter(Book.content_hash == content_hash).order_by(Book.id.asc()).first()
+        if existing:
+            ingested = db.query(Section.id).filter(Section.book_id == existing.id).first() is not None
+            if not ingested and not os.path.exists(existing.file_path):
+                existing.file_path = store_pdf_file(tmp_path, existing.id, filename)
+                db.commit()
+                db.refresh(existing)
+            else:
+                discard_upload(tmp_path)
+            if ingested:
+                logger.info("Duplicate upload reused", extra={"book_id": existing.id, "sha256": content_hash})
+            else:
+                job_id = enqueue_once(f"ingest:{existing.id}", tasks.ingest_pdf_job, existing.id)
+                logger.info(
+                    "Duplicate upload of unfinished book re-ingested",
+                    extra={"book_id": existing.id, "job_id": job_id, "sha256": content_hash},
+                )
+            return existing
+    try:
+        book = Book(title=filename, file_path="", content_hash=content_hash)
+        db.add(book)
+        db.flush()
+        book.file_path = store_pdf_file(tmp_path, book.id, filename)
+        db.commit()
+    except Exception:
+        db.rollback()
+        discard_upload(tmp_path)
+        raise
     db.refresh(book)
 
-    queue = get_queue()
-    job = queue.enqueue(tasks.ingest_pdf_job, book.id)
-    logger.info("Book uploaded", extra={"book_id": book.id, "job_id": job.id})
+    job_id = enqueue_once(f"ingest:{book.id}", tasks.ingest_pdf_job, book.id)
+    logger.info(
+        "Book uploaded",
+        extra={"book_id": book.id, "job_id": job_id, "sha256": content_hash, "size_bytes": size},
+    )
     return book
 
 
@@ -80,6 +125,8 @@ def delete_book(book_id: int, db: Session = Depends(get_db)):
     db.delete(book)
     db.commit()
     _summary_clicks.pop(book_id, None)
+    invalidate_page_index(book_id)
+    delete_page_texts(book_id)
     for path in [file_path]:
         try:
             if path and os.path.exists(path):
@@ -101,8 +148,38 @@ def get_book_sections(book_id: int, db: Session = Depends(get_db)):
     return build_tree(sections)
 
 
+@router.post("/books/{book_id}/summaries:generate_all", response_model=SummaryGenerateResponse)
+def generate_book_summaries(
+    book_id: int,
+    concurrency: int | None = Query(None, ge=1, le=16),
+    max_age_hours: float | None = Query(None, ge=0),
+    hierarchical: bool = Query(True),
+    db: Session = Depends(get_db),
+):
+    if not db.get(Book, book_id):
+        raise HTTPException(status_code=404, detail="Book not found")
+    job_id = enqueue_once(
+        f"book_summaries:{book_id}",
+        tasks.generate_book_summaries_job,
+        book_id,
+        concurrency or settings.batch_summary_concurrency,
+        settings.batch_summary_max_age_hours if max_age_hours is None else max_age_hours,
+        hierarchical,
+        job_timeout=settings.batch_summary_timeout,
+    )
+    return SummaryGenerateResponse(job_id=job_id)
+
+
+@router.get("/books/{book_id}/summaries:progress")
+def get_book_summaries_progress(book_id: int):
+    data = get_redis().get(book_summary_progress_key(book_id))
+    if not data:
+        return {"book_id": book_id, "status": "idle"}
+    return json.loads(data)
+
+
 @router.get("/books/{book_id}/pdf")
-def get_book_pdf(book_id: int, db: Session = Depends(get_db)):
+def get_book_pdf(book_id: int, request: Request, db: Session = Depends(get_db)):
     book = db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
@@ -113,9 +190,8 @@ def get_book_pdf(book_id: int, db: Session = Depends(get_db)):
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Headers": "Range",
         "Access-Control-Expose-Headers": "Accept-Ranges, Content-Range, Content-Length",
-        "Accept-Ranges": "bytes",
     }
-    return FileResponse(book.file_path, media_type="application/pdf", headers=headers)
+    return ranged_file_response(request, book.file_path, "application/pdf", headers)
 
 
 @router.get("/books/{book_id}/viewer", response_class=HTMLResponse)
@@ -463,15 +539,49 @@ def get_book_viewer(book_id: int, request: Request, page: int = 1, db: Session =
           const question = qaQuestion.value.trim();
           if (!question) return;
           qaStatus.textContent = "Thinking...";
-          fetch(apiBase + "/books/" + bookId + "/qa", {{
+          currentAnswer = "";
+          qaAnswer.textContent = "";
+          qaSaveBtn.disabled = true;
+          fetch(apiBase + "/books/" + bookId + "/qa:stream", {{
             method: "POST",
             headers: {{ "Content-Type": "application/json" }},
             body: JSON.stringify({{
               selection_text: lastSelection.text,
               question: question
             }})
-          }}).then(resp => resp.json()).then(data => {{
-            currentAnswer = data.answer || "";
+          }}).then(async resp => {{
+            if (!resp.ok || !resp.body) throw new Error("stream failed");
+            const reader = resp.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "";
+            while (true) {{
+              const {{ done, value }} = await reader.read();
+              if (done) break;
+              buffer += decoder.decode(value, {{ stream: true }});
+              let boundary = buffer.indexOf("\\n\\n");
+              while (boundary >= 0) {{
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                boundary = buffer.indexOf("\\n\\n");
+                let eventName = "message";
+                let dataText = "";
+                frame.split("\\n").forEach(line => {{
+                  if (line.startsWith("event:")) eventName = line.slice(6).trim();
+                  else if (line.startsWith("data:")) dataText += line.slice(5).trim();
+                }});
+                if (!dataText) continue;
+                const data = JSON.parse(dataText);
+                if (eventName === "token") {{
+                  currentAnswer += data.text || "";
+                  qaAnswer.textContent = currentAnswer;
+                  qaStatus.textContent = "Answering...";
+                }} else if (eventName === "done") {{
+                  currentAnswer = data.answer || currentAnswer;
+                }} else if (eventName === "error") {{
+                  throw new Error(data.detail || "stream failed");
+                }}
+              }}
+            }}
             qaAnswer.textContent = currentAnswer || "No answer returned.";
             qaStatus.textContent = "Answer ready.";
             qaSaveBtn.disabled = !currentAnswer;
@@ -565,4 +675,8 @@ def update_progress(book_id: int, payload: ProgressUpdate, db: Session = Depends
         progress.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(progress)
+    try:
+        prefetch_for_page(db, book_id, payload.last_page)
+    except Exception:
+        logger.exception("Prefetch failed", extra={"book_id": book_id})
     return progress
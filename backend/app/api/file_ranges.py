@@ -0,0 +1,52 @@
+import os
+import re
+from typing import Iterator
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+READ_BLOCK = 64 * 1024
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        length = int(last)
+        start = max(0, size - length)
+        end = size - 1 if length else -1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        while length > 0:
+            block = handle.read(min(READ_BLOCK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def ranged_file_response(request: Request, path: str, media_type: str, headers: dict | None = None) -> Response:
+    size = os.path.getsize(path)
+    headers = {**(headers or {}), "Accept-Ranges": "bytes"}
+    byte_range = parse_range(request.headers.get("range"), size)
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(_iter_file(path, start, end - start + 1), status_code=206, media_type=media_type, headers=headers)
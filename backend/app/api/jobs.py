@@ -1,7 +1,13 @@
+import json
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from rq.job import Job, NoSuchJobError
 from redis import Redis
+from redis import asyncio as aioredis
+from app.api.sse import SSE_HEADERS, sse_event
 from app.core.config import settings
+from app.workers.rq_queue import job_stream_channel
 
 router = APIRouter()
 
@@ -14,3 +20,44 @@ def get_job(job_id: str):
     except NoSuchJobError:
         return {"id": job_id, "status": "not_found", "result": None}
     return {"id": job.id, "status": job.get_status(), "result": job.result}
+
+
+def _final_event(job_state: dict) -> str | None:
+    if job_state["status"] == "finished":
+        return sse_event("done", {"result": job_state["result"]})
+    if job_state["status"] in {"failed", "stopped", "canceled", "not_found"}:
+        return sse_event("error", {"detail": f"Job {job_state['status']}"})
+    return None
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    async def events():
+        redis_conn = aioredis.from_url(settings.redis_url)
+        pubsub = redis_conn.pubsub()
+        await pubsub.subscribe(job_stream_channel(job_id))
+        try:
+            final = _final_event(await run_in_threadpool(get_job, job_id))
+            if final:
+                yield final
+                return
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=settings.sse_keepalive_seconds)
+                if message is None:
+                    final = _final_event(await run_in_threadpool(get_job, job_id))
+                    if final:
+                        yield final
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                payload = json.loads(message["data"])
+                event = payload.pop("event")
+                yield sse_event(event, payload)
+                if event in {"done", "error"}:
+                    return
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await redis_conn.aclose()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from app.services.llm_cache import get_llm_cache
+
+router = APIRouter()
+
+
+@router.get("/llm/cache")
+def get_llm_cache_stats():
+    cache = get_llm_cache()
+    if cache is None:
+        return {"backend": "none", "hits": 0, "misses": 0, "entries": 0}
+    return cache.stats()
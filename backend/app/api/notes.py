@@ -1,12 +1,16 @@
 import json
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.api.sse import SSE_HEADERS, sse_event
+from app.db.session import SessionLocal, get_db
 from app.models import Book, Note, Section
 from app.schemas.note import NoteCreate, NoteOut
 from app.schemas.section import SectionOut
-from app.services.qa_service import answer_question
+from app.services.qa_service import aanswer_question, astream_answer
+from app.services.section_index import get_page_index
 
 logger = logging.getLogger(__name__)
 
@@ -15,44 +19,63 @@ router = APIRouter()
 
 @router.get("/books/{book_id}/sections/by_page", response_model=SectionOut)
 def get_section_by_page(book_id: int, page: int = Query(..., ge=1), db: Session = Depends(get_db)):
-    section = (
-        db.query(Section)
-        .filter(Section.book_id == book_id, Section.page_start <= page, Section.page_end >= page)
-        .order_by((Section.page_end - Section.page_start).asc())
-        .first()
-    )
+    section_id = get_page_index(db, book_id).lookup(page)
+    section = db.get(Section, section_id) if section_id else None
     if not section:
         raise HTTPException(status_code=404, detail="Section not found for page")
     return section
 
 
+def _book_exists(book_id: int) -> bool:
+    with SessionLocal() as db:
+        return db.get(Book, book_id) is not None
+
+
 @router.post("/books/{book_id}/qa")
-def ask_question(book_id: int, payload: dict, db: Session = Depends(get_db)):
-    book = db.get(Book, book_id)
-    if not book:
+async def ask_question(book_id: int, payload: dict):
+    if not await run_in_threadpool(_book_exists, book_id):
         raise HTTPException(status_code=404, detail="Book not found")
     selection_text = (payload.get("selection_text") or "").strip()
     question = (payload.get("question") or "").strip()
     if not selection_text or not question:
         raise HTTPException(status_code=400, detail="selection_text and question are required")
-    answer = answer_question(selection_text, question)
+    answer = await aanswer_question(selection_text, question, use_cache=not payload.get("regenerate", False))
     return {"answer": answer}
 
 
+@router.post("/books/{book_id}/qa:stream")
+async def ask_question_stream(book_id: int, payload: dict):
+    if not await run_in_threadpool(_book_exists, book_id):
+        raise HTTPException(status_code=404, detail="Book not found")
+    selection_text = (payload.get("selection_text") or "").strip()
+    question = (payload.get("question") or "").strip()
+    if not selection_text or not question:
+        raise HTTPException(status_code=400, detail="selection_text and question are required")
+    use_cache = not payload.get("regenerate", False)
+
+    async def events():
+        parts = []
+        try:
+            async for token in astream_answer(selection_text, question, use_cache=use_cache):
+                parts.append(token)
+                yield sse_event("token", {"text": token})
+        except Exception:
+            logger.exception("QA stream failed", extra={"book_id": book_id})
+            yield sse_event("error", {"detail": "Failed to get answer"})
+            return
+        yield sse_event("done", {"answer": "".join(parts).strip()})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/books/{book_id}/notes", response_model=NoteOut)
 def create_note(book_id: int, note_in: NoteCreate, db: Session = Depends(get_db)):
     book = db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    section = (
-        db.query(Section)
-        .filter(Section.book_id == book_id, Section.page_start <= note_in.page_num, Section.page_end >= note_in.page_num)
-        .order_by((Section.page_end - Section.page_start).asc())
-        .first()
-    )
     note = Note(
         book_id=book_id,
-        section_id=section.id if section else None,
+        section_id=get_page_index(db, book_id).lookup(note_in.page_num),
         page_num=note_in.page_num,
         selection_text=note_in.selection_text,
         question=note_in.question,
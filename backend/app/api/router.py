@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api import books, sections, summaries, jobs, assets, notes
+from app.api import books, sections, summaries, jobs, assets, notes, llm
 
 api_router = APIRouter()
 api_router.include_router(books.router, tags=["books"])
@@ -8,3 +8,4 @@ api_router.include_router(summaries.router, tags=["summaries"])
 api_router.include_router(jobs.router, tags=["jobs"])
 api_router.include_router(assets.router, tags=["assets"])
 api_router.include_router(notes.router, tags=["notes"])
+api_router.include_router(llm.router, tags=["llm"])
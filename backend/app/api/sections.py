@@ -6,7 +6,7 @@ from app.schemas.section import SectionOut
 from app.schemas.summary import SummaryGenerateResponse, SummaryVersionOut
 from app.schemas.asset import SectionAssetOut
 from app.services.summary_service import generate_summary
-from app.workers.rq_queue import get_queue
+from app.workers.rq_queue import enqueue_once
 from app.workers import tasks
 
 router = APIRouter()
@@ -24,11 +24,19 @@ def get_section(section_id: int, db: Session = Depends(get_db)):
 def generate_section_summary(
     section_id: int,
     recursive: bool = Query(False),
+    hierarchical: bool = Query(False),
+    regenerate: bool = Query(False),
     db: Session = Depends(get_db),
 ):
-    queue = get_queue()
-    job = queue.enqueue(tasks.generate_summary_job, section_id, recursive)
-    return SummaryGenerateResponse(job_id=job.id)
+    job_id = enqueue_once(
+        f"summary:{section_id}:{recursive}:{hierarchical}:{regenerate}",
+        tasks.generate_summary_job,
+        section_id,
+        recursive,
+        hierarchical,
+        regenerate,
+    )
+    return SummaryGenerateResponse(job_id=job_id)
 
 
 @router.get("/sections/{section_id}/summary_versions", response_model=list[SummaryVersionOut])
@@ -1,12 +1,18 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+import shutil
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
+from app.api.file_ranges import ranged_file_response
+from app.api.jobs import get_job
 from app.db.session import get_db
 from app.models import SummaryVersion, AudioAsset
 from app.schemas.summary import SummaryVersionOut
-from app.services.tts_service import generate_audio
-from app.workers.rq_queue import get_queue
+from app.core.config import settings
+from app.services.audio_stream import iter_progressive_audio, wait_for_manifest
+from app.services.tts_service import AUDIO_MEDIA_TYPES, audio_dir, audio_parts_dir, generate_audio
+from app.workers.rq_queue import ACTIVE_JOB_STATUSES, enqueue_once
 from app.workers import tasks
 
 router = APIRouter()
@@ -22,29 +28,81 @@ def get_summary_version(version_id: int, db: Session = Depends(get_db)):
 
 @router.post("/summary_versions/{version_id}/tts")
 def generate_tts(version_id: int):
-    queue = get_queue()
-    job = queue.enqueue(tasks.generate_tts_job, version_id)
-    return {"job_id": job.id}
+    job_id = enqueue_once(f"tts:{version_id}", tasks.generate_tts_job, version_id)
+    return {"job_id": job_id}
 
 
-@router.get("/summary_versions/{version_id}/audio")
-def get_audio(version_id: int, db: Session = Depends(get_db)):
+def _latest_audio(db: Session, version_id: int) -> AudioAsset | None:
     audio = (
         db.query(AudioAsset)
         .filter(AudioAsset.version_id == version_id)
         .order_by(AudioAsset.created_at.desc())
         .first()
     )
-    if not audio or not os.path.exists(audio.file_path):
-        raise HTTPException(status_code=404, detail="Audio not found")
-    media_type = "audio/mpeg" if audio.format == "mp3" else "audio/wav"
+    if audio and os.path.exists(audio.file_path):
+        return audio
+    return None
+
+
+def _audio_file_response(request: Request, audio: AudioAsset) -> Response:
     filename = os.path.basename(audio.file_path)
     headers = {
-        "Accept-Ranges": "bytes",
         "Content-Disposition": f'inline; filename="{filename}"',
         "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Headers": "Range",
+        "Access-Control-Expose-Headers": "Accept-Ranges, Content-Range, Content-Length",
     }
-    return FileResponse(audio.file_path, media_type=media_type, filename=filename, headers=headers)
+    media_type = AUDIO_MEDIA_TYPES.get(audio.format, "application/octet-stream")
+    return ranged_file_response(request, audio.file_path, media_type, headers)
+
+
+@router.get("/summary_versions/{version_id}/audio")
+def get_audio(version_id: int, request: Request, db: Session = Depends(get_db)):
+    audio = _latest_audio(db, version_id)
+    if not audio:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return _audio_file_response(request, audio)
+
+
+def _audio_paths(db: Session, version_id: int) -> str | None:
+    version = db.get(SummaryVersion, version_id)
+    if not version:
+        return None
+    return audio_dir(version.summary.section.book_id, version.summary.section_id)
+
+
+@router.get("/summary_versions/{version_id}/audio/stream")
+async def stream_audio(
+    version_id: int,
+    request: Request,
+    job_id: str | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    audio = await run_in_threadpool(_latest_audio, db, version_id)
+    if audio:
+        return _audio_file_response(request, audio)
+    dir_path = await run_in_threadpool(_audio_paths, db, version_id)
+    if dir_path is None:
+        raise HTTPException(status_code=404, detail="Summary version not found")
+    await run_in_threadpool(db.close)
+    parts_dir = audio_parts_dir(dir_path, version_id)
+    manifest = await wait_for_manifest(parts_dir, job_id, settings.tts_stream_wait_seconds)
+    if manifest is None:
+        if job_id:
+            job = await run_in_threadpool(get_job, job_id)
+            if job["status"] in ACTIVE_JOB_STATUSES:
+                return JSONResponse({"status": job["status"], "job_id": job_id}, status_code=202, headers={"Retry-After": "1"})
+        audio = await run_in_threadpool(_latest_audio, db, version_id)
+        if audio:
+            return _audio_file_response(request, audio)
+        raise HTTPException(status_code=404, detail="Audio not found")
+    final_path = os.path.join(dir_path, f"{version_id}.{manifest['format']}")
+    headers = {"Cache-Control": "no-store", "Access-Control-Allow-Origin": "*"}
+    return StreamingResponse(
+        iter_progressive_audio(parts_dir, final_path, manifest),
+        media_type=AUDIO_MEDIA_TYPES.get(manifest["format"], "application/octet-stream"),
+        headers=headers,
+    )
 
 
 @router.delete("/summary_versions/{version_id}")
@@ -55,6 +113,8 @@ def delete_summary_version(version_id: int, db: Session = Depends(get_db)):
     for audio in version.audio_assets:
         if os.path.exists(audio.file_path):
             os.remove(audio.file_path)
+    parts_dir = audio_parts_dir(audio_dir(version.summary.section.book_id, version.summary.section_id), version_id)
+    shutil.rmtree(parts_dir, ignore_errors=True)
     db.delete(version)
     db.commit()
     return {"status": "deleted"}
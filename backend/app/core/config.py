@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,9 +15,19 @@ class Settings(BaseSettings):
     pdf_dir: str = "/data/pdfs"
     image_dir: str = "/data/images"
     audio_dir: str = "/data/audio"
+    text_dir: str = "/data/text"
+
+    upload_chunk_size: int = 1024 * 1024
+
+    ingest_parallel: bool = False
+    ingest_shard_size: int = 100
+    ingest_parallel_min_pages: int = 1000
+    ingest_workers: int = 0
 
     redis_url: str = "redis://redis:6379/0"
     rq_default_timeout: int = 1200
+    rq_max_queue_wait: int = 3600
+    rq_simple_worker: bool = False
     rate_limit_per_min: int = 60
 
     llm_provider: str = "ollama"
@@ -24,15 +35,66 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini"
     ollama_url: str = "http://ollama:11434"
     ollama_model: str = "llama3"
+    openai_timeout: float = 60
+    ollama_timeout: float = 120
+    llm_connect_timeout: float = 10
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_max_retries: int = 2
+    llm_retry_backoff: float = 1.0
+    llm_retry_max_delay: float = 30.0
+
+    qa_max_concurrency: int = 32
+    sse_keepalive_seconds: float = 15.0
+
+    llm_cache_backend: str = "none"
+    llm_cache_path: str = "/data/llm_cache.sqlite3"
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 10000
 
     max_summary_chars: int = 18000
     large_content_threshold: int = 22000
+    summary_map_reduce: bool = False
+    summary_chunk_chars: int = 12000
+    summary_map_concurrency: int = 4
+    summary_map_max_chars: int = 240000
+    batch_summary_concurrency: int = 2
+    batch_summary_max_age_hours: float = 0
+    batch_summary_timeout: int = 6 * 3600
+    batch_summary_progress_ttl: int = 24 * 3600
+    prefetch_enabled: bool = False
+    prefetch_ahead: int = 2
+    prefetch_tts: bool = False
+    prefetch_budget_per_book: int = 50
 
     tts_backend: str = "gtts"
     piper_bin: str | None = None
     piper_model: str | None = None
+    piper_pool_size: int = 2
+    piper_timeout: float = 120
     tts_allow_network: bool = True
     tts_lang: str = "en-in"
+    tts_chunk_chars: int = 600
+    tts_max_workers: int = 4
+    tts_stream_wait_seconds: float = 10
+    tts_stream_timeout: float = 120
+    tts_cache_enabled: bool = False
+    tts_cache_dir: str = "/data/tts_cache"
+    tts_cache_max_bytes: int = 1024 * 1024 * 1024
+    tts_transcode_format: str = ""
+    tts_transcode_bitrate: str = "32k"
+    ffmpeg_bin: str = "ffmpeg"
+
+    mock_seed: int = 0
+    mock_latency_distribution: str = "fixed"
+    mock_latency_ms: float = 200
+    mock_latency_jitter_ms: float = 0
+    mock_error_rate: float = 0.0
+    mock_llm_words: int = 120
+    mock_llm_tokens_per_second: float = 50
+    mock_tts_sample_rate: int = Field(16000, gt=0)
+    mock_tts_chars_per_second: float = Field(15, gt=0)
+    mock_tts_realtime_factor: float = Field(0.0, ge=0)
 
     log_level: str = "INFO"
 
@@ -13,6 +13,7 @@ class SectionAsset(Base):
     page_num: Mapped[int] = mapped_column(Integer)
     bbox: Mapped[str | None] = mapped_column(String(255))
     file_path: Mapped[str] = mapped_column(String(1024))
+    format: Mapped[str] = mapped_column(String(16), default="png")
     caption: Mapped[str] = mapped_column(String(512))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -7,6 +7,7 @@ class SectionAssetOut(BaseModel):
     section_id: int | None
     page_num: int
     file_path: str
+    format: str
     caption: str
     created_at: datetime
 
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import struct
+import time
+import wave
+from typing import AsyncIterator, BinaryIO, Iterator
+from app.core.config import settings
+from app.services.tts_service import PARTS_FAILED, PARTS_MANIFEST
+
+POLL_INTERVAL = 0.2
+READ_BLOCK = 64 * 1024
+OPEN_AHEAD = 4
+WAV_STREAM_DATA_SIZE = 0x7FFFFFFF
+
+
+def _wav_stream_header(params: wave._wave_params) -> bytes:
+    block_align = params.nchannels * params.sampwidth
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + WAV_STREAM_DATA_SIZE,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        params.nchannels,
+        params.framerate,
+        params.framerate * block_align,
+        block_align,
+        params.sampwidth * 8,
+        b"data",
+        WAV_STREAM_DATA_SIZE,
+    )
+
+
+def _read_manifest(parts_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(parts_dir, PARTS_MANIFEST), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _run_failed(parts_dir: str, run_id: str | None) -> bool:
+    try:
+        with open(os.path.join(parts_dir, PARTS_FAILED), encoding="utf-8") as handle:
+            return run_id is None or handle.read() == run_id
+    except FileNotFoundError:
+        return False
+
+
+async def wait_for_manifest(parts_dir: str, run_id: str | None, timeout: float) -> dict | None:
+    deadline = time.monotonic() + timeout
+    while True:
+        manifest = _read_manifest(parts_dir)
+        if manifest is not None and (run_id is None or manifest.get("run_id") == run_id):
+            if not _run_failed(parts_dir, manifest.get("run_id")):
+                return manifest
+        if time.monotonic() >= deadline:
+            return None
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def _run_replaced(parts_dir: str, manifest: dict) -> bool:
+    current = _read_manifest(parts_dir)
+    return current is None or current.get("run_id") != manifest.get("run_id")
+
+
+async def _put_handle(handles: asyncio.Queue, kind: str, handle: BinaryIO) -> None:
+    try:
+        await handles.put((kind, handle))
+    except BaseException:
+        handle.close()
+        raise
+
+
+async def _queue_parts(parts_dir: str, final_path: str, manifest: dict, handles: asyncio.Queue) -> None:
+    fmt = manifest["format"]
+    for index in range(manifest["count"]):
+        part_path = os.path.join(parts_dir, f"{index:04d}.{fmt}")
+        deadline = time.monotonic() + settings.tts_stream_timeout
+        while True:
+            try:
+                await _put_handle(handles, "part", open(part_path, "rb"))
+                break
+            except FileNotFoundError:
+                pass
+            try:
+                await _put_handle(handles, "tail", open(final_path, "rb"))
+                return
+            except FileNotFoundError:
+                pass
+            if _run_failed(parts_dir, manifest.get("run_id")) or _run_replaced(parts_dir, manifest):
+                return
+            if time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def _open_parts(parts_dir: str, final_path: str, manifest: dict, handles: asyncio.Queue) -> None:
+    try:
+        await _queue_parts(parts_dir, final_path, manifest, handles)
+    finally:
+        if not asyncio.current_task().cancelling():
+            await handles.put(None)
+
+
+def _read_part(handle: BinaryIO, fmt: str) -> tuple[wave._wave_params | None, bytes]:
+    if fmt == "wav":
+        with wave.open(handle, "rb") as part:
+            return part.getparams(), part.readframes(part.getnframes())
+    return None, handle.read()
+
+
+def _iter_tail(handle: BinaryIO, fmt: str, offset: int | None) -> Iterator[bytes]:
+    if fmt == "wav" and offset is not None:
+        with wave.open(handle, "rb") as audio:
+            frame_size = audio.getsampwidth() * audio.getnchannels()
+            audio.setpos(offset // frame_size)
+            while block := audio.readframes(max(1, READ_BLOCK // frame_size)):
+                yield block
+        return
+    handle.seek(offset or 0)
+    while block := handle.read(READ_BLOCK):
+        yield block
+
+
+async def iter_progressive_audio(parts_dir: str, final_path: str, manifest: dict) -> AsyncIterator[bytes]:
+    fmt = manifest["format"]
+    handles: asyncio.Queue = asyncio.Queue(maxsize=OPEN_AHEAD)
+    opener = asyncio.create_task(_open_parts(parts_dir, final_path, manifest, handles))
+    sent = None
+    try:
+        while (item := await handles.get()) is not None:
+            kind, handle = item
+            with handle:
+                if kind == "tail":
+                    blocks = _iter_tail(handle, fmt, sent)
+                    while (block := await asyncio.to_thread(next, blocks, None)) is not None:
+                        yield block
+                    continue
+                params, payload = await asyncio.to_thread(_read_part, handle, fmt)
+            if sent is None:
+                sent = 0
+                if fmt == "wav":
+                    yield _wav_stream_header(params)
+            yield payload
+            sent += len(payload)
+    finally:
+        opener.cancel()
+        while not handles.empty():
+            item = handles.get_nowait()
+            if item is not None:
+                item[1].close()
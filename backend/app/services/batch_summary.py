@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import Section, Summary, SummaryVersion
+from app.services.summary_service import generate_summary
+
+logger = logging.getLogger(__name__)
+
+
+def _latest_version_times(db: Session, section_ids: list[int]) -> dict[int, datetime]:
+    rows = (
+        db.query(Summary.section_id, func.max(SummaryVersion.created_at))
+        .join(SummaryVersion, SummaryVersion.summary_id == Summary.id)
+        .filter(Summary.section_id.in_(section_ids))
+        .group_by(Summary.section_id)
+        .all()
+    )
+    return {section_id: created_at for section_id, created_at in rows}
+
+
+def plan_book_summaries(db: Session, book_id: int, max_age_hours: float) -> tuple[list[list[int]], set[int], int]:
+    sections = db.query(Section).filter(Section.book_id == book_id).order_by(Section.sort_order).all()
+    by_id = {section.id: section for section in sections}
+    depths: dict[int, int] = {}
+    for section in sections:
+        depth = 0
+        parent_id = section.parent_id
+        while parent_id in by_id:
+            depth += 1
+            parent_id = by_id[parent_id].parent_id
+        depths[section.id] = depth
+    parents = {section.parent_id for section in sections if section.parent_id}
+
+    latest = _latest_version_times(db, list(by_id))
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours) if max_age_hours else None
+    stale = [
+        section.id
+        for section in sections
+        if section.id not in latest or (cutoff is not None and latest[section.id] < cutoff)
+    ]
+
+    levels: dict[int, list[int]] = {}
+    for section_id in stale:
+        levels.setdefault(depths[section_id], []).append(section_id)
+    waves = [levels[depth] for depth in sorted(levels, reverse=True)]
+    return waves, parents, len(sections) - len(stale)
+
+
+def generate_book_summaries(
+    session_factory: Callable[[], Session],
+    book_id: int,
+    concurrency: int,
+    max_age_hours: float,
+    hierarchical: bool,
+    report: Callable[[dict], None],
+) -> dict:
+    db = session_factory()
+    try:
+        waves, parents, fresh = plan_book_summaries(db, book_id, max_age_hours)
+    finally:
+        db.close()
+
+    started = time.time()
+    progress = {
+        "book_id": book_id,
+        "status": "running",
+        "total": sum(len(wave) for wave in waves),
+        "done": 0,
+        "failed": 0,
+        "skipped_fresh": fresh,
+        "eta_seconds": None,
+        "failures": [],
+        "started_at": started,
+    }
+    lock = threading.Lock()
+    report(dict(progress))
+
+    def summarize(section_id: int) -> None:
+        error = None
+        session = session_factory()
+        try:
+            is_parent = section_id in parents
+            version, warning, _ = generate_summary(session, section_id, is_parent and hierarchical, hierarchical)
+            if version is None:
+                error = warning or "No summary produced"
+        except Exception as exc:
+            logger.exception("Batch summary failed", extra={"book_id": book_id, "section_id": section_id})
+            error = str(exc)
+        finally:
+            session.close()
+        with lock:
+            progress["done"] += 1
+            if error:
+                progress["failed"] += 1
+                progress["failures"].append({"section_id": section_id, "error": error})
+            elapsed = time.time() - started
+            remaining = progress["total"] - progress["done"]
+            progress["eta_seconds"] = round(elapsed / progress["done"] * remaining, 1)
+            report(dict(progress, failures=list(progress["failures"])))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for wave in waves:
+            list(pool.map(summarize, wave))
+
+    progress["status"] = "finished"
+    progress["eta_seconds"] = 0
+    report(dict(progress))
+    return progress
@@ -2,27 +2,63 @@ import os
 import fitz
 from app.core.config import settings
 
+IMAGE_MEDIA_TYPES = {"png": "image/png", "jpeg": "image/jpeg"}
 
-def extract_images(doc: fitz.Document, book_id: int) -> list[dict]:
+
+def _write_atomic(file_path: str, data: bytes) -> None:
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
+
+
+def _encode_png(doc: fitz.Document, xref: int) -> bytes:
+    pix = fitz.Pixmap(doc, xref)
+    if pix.n - pix.alpha >= 4:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    return pix.tobytes("png")
+
+
+def _existing_image(book_dir: str, xref: int) -> tuple[str, str] | None:
+    for fmt in IMAGE_MEDIA_TYPES:
+        file_path = os.path.join(book_dir, f"xref{xref}.{fmt}")
+        if os.path.exists(file_path):
+            return file_path, fmt
+    return None
+
+
+def _save_image(doc: fitz.Document, xref: int, book_dir: str) -> tuple[str, str]:
+    info = doc.extract_image(xref) or {}
+    fmt = info.get("ext")
+    if fmt in IMAGE_MEDIA_TYPES and info.get("colorspace", 3) < 4 and info.get("image"):
+        data = info["image"]
+    else:
+        fmt = "png"
+        data = _encode_png(doc, xref)
+    file_path = os.path.join(book_dir, f"xref{xref}.{fmt}")
+    _write_atomic(file_path, data)
+    return file_path, fmt
+
+
+def extract_images(doc: fitz.Document, book_id: int, first_page: int = 1, last_page: int | None = None) -> list[dict]:
     assets = []
     book_dir = os.path.join(settings.image_dir, str(book_id))
     os.makedirs(book_dir, exist_ok=True)
+    last_page = doc.page_count if last_page is None else last_page
+    saved: dict[int, tuple[str, str]] = {}
 
-    for page_index in range(doc.page_count):
+    for page_index in range(first_page - 1, last_page):
         page = doc.load_page(page_index)
-        image_list = page.get_images(full=True)
-        for img_index, img in enumerate(image_list, start=1):
+        for img in page.get_images(full=True):
             xref = img[0]
-            pix = fitz.Pixmap(doc, xref)
-            if pix.n - pix.alpha >= 4:
-                pix = fitz.Pixmap(fitz.csRGB, pix)
-            filename = f"p{page_index + 1}_img{img_index}.png"
-            file_path = os.path.join(book_dir, filename)
-            pix.save(file_path)
+            if xref not in saved:
+                saved[xref] = _existing_image(book_dir, xref) or _save_image(doc, xref, book_dir)
+            file_path, fmt = saved[xref]
             assets.append(
                 {
                     "page_num": page_index + 1,
                     "file_path": file_path,
+                    "format": fmt,
                     "caption": f"Page {page_index + 1} - Figure",
                 }
             )
@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from typing import AsyncIterator, Iterator, Protocol
+from redis import Redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache(Protocol):
+    def get(self, key: str) -> str | None:
+        ...
+
+    def set(self, key: str, value: str) -> None:
+        ...
+
+    def record(self, hit: bool) -> None:
+        ...
+
+    def stats(self) -> dict:
+        ...
+
+
+class SQLiteLLMCache:
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache_stats (name TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            yield conn
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def record(self, hit: bool) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO llm_cache_stats (name, count) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET count = count + 1",
+                ("hits" if hit else "misses",),
+            )
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, count FROM llm_cache_stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {"backend": "sqlite", "hits": counters.get("hits", 0), "misses": counters.get("misses", 0), "entries": entries}
+
+
+class RedisLLMCache:
+    prefix = "llm_cache"
+
+    def __init__(self, redis_conn: Redis, ttl_seconds: int, max_entries: int) -> None:
+        self.redis = redis_conn
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> str | None:
+        value = self.redis.get(f"{self.prefix}:entry:{key}")
+        if value is None:
+            self.redis.zrem(f"{self.prefix}:lru", key)
+            return None
+        self.redis.zadd(f"{self.prefix}:lru", {key: time.time()})
+        return value.decode("utf-8")
+
+    def _purge_expired(self) -> None:
+        if self.ttl_seconds:
+            self.redis.zremrangebyscore(f"{self.prefix}:lru", "-inf", time.time() - self.ttl_seconds)
+
+    def set(self, key: str, value: str) -> None:
+        pipe = self.redis.pipeline()
+        pipe.set(f"{self.prefix}:entry:{key}", value, ex=self.ttl_seconds or None)
+        pipe.zadd(f"{self.prefix}:lru", {key: time.time()})
+        pipe.execute()
+        self._purge_expired()
+        if self.max_entries:
+            overflow = self.redis.zcard(f"{self.prefix}:lru") - self.max_entries
+            if overflow > 0:
+                stale = self.redis.zrange(f"{self.prefix}:lru", 0, overflow - 1)
+                if stale:
+                    pipe = self.redis.pipeline()
+                    pipe.delete(*[f"{self.prefix}:entry:{item.decode('utf-8')}" for item in stale])
+                    pipe.zrem(f"{self.prefix}:lru", *stale)
+                    pipe.execute()
+
+    def record(self, hit: bool) -> None:
+        self.redis.hincrby(f"{self.prefix}:stats", "hits" if hit else "misses", 1)
+
+    def stats(self) -> dict:
+        self._purge_expired()
+        counters = self.redis.hgetall(f"{self.prefix}:stats")
+        return {
+            "backend": "redis",
+            "hits": int(counters.get(b"hits", 0)),
+            "misses": int(counters.get(b"misses", 0)),
+            "entries": self.redis.zcard(f"{self.prefix}:lru"),
+        }
+
+
+class CachedProvider:
+    def __init__(self, provider, cache: LLMCache, read: bool = True) -> None:
+        self.provider = provider
+        self.cache = cache
+        self.read = read
+        self.name = getattr(provider, "name", type(provider).__name__)
+        self.model = getattr(provider, "model", None)
+        self.temperature = getattr(provider, "temperature", None)
+
+    def cache_key(self, prompt: str, context: str) -> str:
+        payload = json.dumps([self.name, self.model, prompt, context, self.temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generate(self, prompt: str, context: str) -> str:
+        key = self.cache_key(prompt, context)
+        if self.read:
+            cached = self.cache.get(key)
+            self.cache.record(cached is not None)
+            if cached is not None:
+                return cached
+        result = self.provider.generate(prompt, context)
+        self.cache.set(key, result)
+        return result
+
+    async def agenerate(self, prompt: str, context: str) -> str:
+        key = self.cache_key(prompt, context)
+        if self.read:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            await asyncio.to_thread(self.cache.record, cached is not None)
+            if cached is not None:
+                return cached
+        result = await self.provider.agenerate(prompt, context)
+        await asyncio.to_thread(self.cache.set, key, result)
+        return result
+
+    def stream(self, prompt: str, context: str) -> Iterator[str]:
+        key = self.cache_key(prompt, context)
+        if self.read:
+            cached = self.cache.get(key)
+            self.cache.record(cached is not None)
+            if cached is not None:
+                yield cached
+                return
+        parts = []
+        for token in self.provider.stream(prompt, context):
+            parts.append(token)
+            yield token
+        self.cache.set(key, "".join(parts).strip())
+
+    async def astream(self, prompt: str, context: str) -> AsyncIterator[str]:
+        key = self.cache_key(prompt, context)
+        if self.read:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            await asyncio.to_thread(self.cache.record, cached is not None)
+            if cached is not None:
+                yield cached
+                return
+        parts = []
+        async for token in self.provider.astream(prompt, context):
+            parts.append(token)
+            yield token
+        await asyncio.to_thread(self.cache.set, key, "".join(parts).strip())
+
+
+_cache: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache | None:
+    global _cache
+    backend = settings.llm_cache_backend.lower()
+    if backend in {"", "none", "off"}:
+        return None
+    if _cache is None:
+        if backend == "sqlite":
+            _cache = SQLiteLLMCache(settings.llm_cache_path, settings.llm_cache_ttl_seconds, settings.llm_cache_max_entries)
+        elif backend == "redis":
+            _cache = RedisLLMCache(
+                Redis.from_url(settings.redis_url), settings.llm_cache_ttl_seconds, settings.llm_cache_max_entries
+            )
+        else:
+            raise ValueError(f"Unsupported LLM cache backend: {settings.llm_cache_backend}")
+        logger.info("Using LLM response cache", extra={"backend": backend})
+    return _cache
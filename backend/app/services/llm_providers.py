@@ -1,57 +1,294 @@
+import asyncio
+import json
 import logging
-from typing import Protocol
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Protocol
 import httpx
 from app.core.config import settings
+from app.services.llm_cache import CachedProvider, get_llm_cache
+from app.services.mock_backends import MockProvider
 
 logger = logging.getLogger(__name__)
 
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_clients: dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+_clients_pid = os.getpid()
+_async_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _client_options(timeout: float) -> dict:
+    return {
+        "timeout": httpx.Timeout(timeout, connect=settings.llm_connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+        ),
+    }
+
+
+def get_http_client(base_url: str, timeout: float) -> httpx.Client:
+    global _clients_pid
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+        client = _clients.get(base_url)
+        if client is None:
+            client = httpx.Client(base_url=base_url, **_client_options(timeout))
+            _clients[base_url] = client
+        return client
+
+
+def get_async_http_client(base_url: str, timeout: float) -> httpx.AsyncClient:
+    client = _async_clients.get(base_url)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(base_url=base_url, **_client_options(timeout))
+        _async_clients[base_url] = client
+    return client
+
+
+async def close_async_http_clients() -> None:
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None = None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), settings.llm_retry_max_delay)
+    return min(settings.llm_retry_backoff * (2**attempt), settings.llm_retry_max_delay)
+
+
+def post_with_retry(client: httpx.Client, path: str, **kwargs) -> httpx.Response:
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = client.post(path, **kwargs)
+        except httpx.TransportError:
+            if attempt >= settings.llm_max_retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= settings.llm_max_retries:
+                response.raise_for_status()
+                return response
+        delay = _retry_delay(attempt, response)
+        logger.warning("Retrying LLM request", extra={"path": path, "attempt": attempt + 1, "delay": delay})
+        time.sleep(delay)
+        attempt += 1
+
+
+async def apost_with_retry(client: httpx.AsyncClient, path: str, **kwargs) -> httpx.Response:
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = await client.post(path, **kwargs)
+        except httpx.TransportError:
+            if attempt >= settings.llm_max_retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= settings.llm_max_retries:
+                response.raise_for_status()
+                return response
+        delay = _retry_delay(attempt, response)
+        logger.warning("Retrying LLM request", extra={"path": path, "attempt": attempt + 1, "delay": delay})
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+@contextmanager
+def stream_with_retry(client: httpx.Client, path: str, **kwargs) -> Iterator[httpx.Response]:
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = client.send(client.build_request("POST", path, **kwargs), stream=True)
+        except httpx.TransportError:
+            if attempt >= settings.llm_max_retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= settings.llm_max_retries:
+                break
+            response.close()
+        delay = _retry_delay(attempt, response)
+        logger.warning("Retrying LLM stream", extra={"path": path, "attempt": attempt + 1, "delay": delay})
+        time.sleep(delay)
+        attempt += 1
+    try:
+        response.raise_for_status()
+        yield response
+    finally:
+        response.close()
+
+
+@asynccontextmanager
+async def astream_with_retry(client: httpx.AsyncClient, path: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = await client.send(client.build_request("POST", path, **kwargs), stream=True)
+        except httpx.TransportError:
+            if attempt >= settings.llm_max_retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= settings.llm_max_retries:
+                break
+            await response.aclose()
+        delay = _retry_delay(attempt, response)
+        logger.warning("Retrying LLM stream", extra={"path": path, "attempt": attempt + 1, "delay": delay})
+        await asyncio.sleep(delay)
+        attempt += 1
+    try:
+        response.raise_for_status()
+        yield response
+    finally:
+        await response.aclose()
+
 
 class LLMProvider(Protocol):
     def generate(self, prompt: str, context: str) -> str:
         ...
 
+    async def agenerate(self, prompt: str, context: str) -> str:
+        ...
+
+    def stream(self, prompt: str, context: str) -> Iterator[str]:
+        ...
+
+    def astream(self, prompt: str, context: str) -> AsyncIterator[str]:
+        ...
+
 
 class OpenAIProvider:
+    name = "openai"
+
     def __init__(self) -> None:
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required for OpenAI provider")
+        self.model = settings.openai_model
+        self.temperature = 0.2
 
-    def generate(self, prompt: str, context: str) -> str:
+    base_url = "https://api.openai.com/v1"
+
+    def _request(self, prompt: str, context: str) -> dict:
         payload = {
-            "model": settings.openai_model,
+            "model": self.model,
             "messages": [
                 {"role": "system", "content": prompt},
                 {"role": "user", "content": context},
             ],
-            "temperature": 0.2,
+            "temperature": self.temperature,
         }
         headers = {
             "Authorization": f"Bearer {settings.openai_api_key}",
             "Content-Type": "application/json",
         }
-        with httpx.Client(timeout=60) as client:
-            response = client.post("https://api.openai.com/v1/chat/completions", json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"].strip()
+        return {"json": payload, "headers": headers}
+
+    def generate(self, prompt: str, context: str) -> str:
+        client = get_http_client(self.base_url, settings.openai_timeout)
+        response = post_with_retry(client, "/chat/completions", **self._request(prompt, context))
+        data = response.json()
+        return data["choices"][0]["message"]["content"].strip()
+
+    async def agenerate(self, prompt: str, context: str) -> str:
+        client = get_async_http_client(self.base_url, settings.openai_timeout)
+        response = await apost_with_retry(client, "/chat/completions", **self._request(prompt, context))
+        data = response.json()
+        return data["choices"][0]["message"]["content"].strip()
+
+    @staticmethod
+    def _parse_stream_line(line: str) -> str | None:
+        if not line.startswith("data:"):
+            return None
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            return None
+        choices = json.loads(data).get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content")
+
+    def stream(self, prompt: str, context: str) -> Iterator[str]:
+        request = self._request(prompt, context)
+        request["json"]["stream"] = True
+        client = get_http_client(self.base_url, settings.openai_timeout)
+        with stream_with_retry(client, "/chat/completions", **request) as response:
+            for line in response.iter_lines():
+                token = self._parse_stream_line(line)
+                if token:
+                    yield token
+
+    async def astream(self, prompt: str, context: str) -> AsyncIterator[str]:
+        request = self._request(prompt, context)
+        request["json"]["stream"] = True
+        client = get_async_http_client(self.base_url, settings.openai_timeout)
+        async with astream_with_retry(client, "/chat/completions", **request) as response:
+            async for line in response.aiter_lines():
+                token = self._parse_stream_line(line)
+                if token:
+                    yield token
 
 
 class OllamaProvider:
-    def generate(self, prompt: str, context: str) -> str:
-        payload = {
-            "model": settings.ollama_model,
+    name = "ollama"
+
+    def __init__(self) -> None:
+        self.model = settings.ollama_model
+        self.temperature = None
+
+    def _payload(self, prompt: str, context: str, stream: bool = False) -> dict:
+        return {
+            "model": self.model,
             "prompt": f"{prompt}\n\n{context}",
-            "stream": False,
+            "stream": stream,
         }
-        url = f"{settings.ollama_url.rstrip('/')}/api/generate"
-        with httpx.Client(timeout=120) as client:
-            response = client.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("response", "").strip()
 
+    def generate(self, prompt: str, context: str) -> str:
+        client = get_http_client(settings.ollama_url.rstrip("/"), settings.ollama_timeout)
+        response = post_with_retry(client, "/api/generate", json=self._payload(prompt, context))
+        data = response.json()
+        return data.get("response", "").strip()
+
+    async def agenerate(self, prompt: str, context: str) -> str:
+        client = get_async_http_client(settings.ollama_url.rstrip("/"), settings.ollama_timeout)
+        response = await apost_with_retry(client, "/api/generate", json=self._payload(prompt, context))
+        data = response.json()
+        return data.get("response", "").strip()
 
-def get_provider() -> LLMProvider:
+    def stream(self, prompt: str, context: str) -> Iterator[str]:
+        client = get_http_client(settings.ollama_url.rstrip("/"), settings.ollama_timeout)
+        with stream_with_retry(client, "/api/generate", json=self._payload(prompt, context, stream=True)) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    async def astream(self, prompt: str, context: str) -> AsyncIterator[str]:
+        client = get_async_http_client(settings.ollama_url.rstrip("/"), settings.ollama_timeout)
+        async with astream_with_retry(client, "/api/generate", json=self._payload(prompt, context, stream=True)) as response:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+
+def _create_provider() -> LLMProvider:
     provider = settings.llm_provider.lower()
     if provider == "openai":
         logger.info("Using OpenAI provider")
@@ -59,4 +296,15 @@ def get_provider() -> LLMProvider:
     if provider == "ollama":
         logger.info("Using Ollama provider")
         return OllamaProvider()
+    if provider == "mock":
+        logger.info("Using mock provider")
+        return MockProvider()
     raise ValueError(f"Unsupported LLM provider: {settings.llm_provider}")
+
+
+def get_provider(use_cache: bool = True) -> LLMProvider:
+    provider = _create_provider()
+    cache = get_llm_cache()
+    if cache is None:
+        return provider
+    return CachedProvider(provider, cache, read=use_cache)
@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+import math
+import random
+import struct
+import threading
+import time
+import wave
+from typing import AsyncIterator, Iterator
+from app.core.config import settings
+
+MOCK_VOCABULARY = (
+    "the book explains how each chapter builds on key ideas with examples figures and a short "
+    "review of the main argument while the author compares methods results and open questions"
+).split()
+
+_rng = random.Random(settings.mock_seed)
+_rng_lock = threading.Lock()
+
+
+class MockBackendError(RuntimeError):
+    pass
+
+
+def _content_rng(*parts: str) -> random.Random:
+    digest = hashlib.sha256("\x1f".join((str(settings.mock_seed), *parts)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _sample_latency() -> float:
+    mean = settings.mock_latency_ms / 1000
+    jitter = settings.mock_latency_jitter_ms / 1000
+    distribution = settings.mock_latency_distribution.lower()
+    with _rng_lock:
+        if distribution == "uniform":
+            return max(0.0, _rng.uniform(mean - jitter, mean + jitter))
+        if distribution == "exponential":
+            return _rng.expovariate(1 / mean) if mean > 0 else 0.0
+        if distribution == "fixed":
+            return mean
+    raise ValueError(f"Unsupported mock latency distribution: {settings.mock_latency_distribution}")
+
+
+def _should_fail() -> bool:
+    with _rng_lock:
+        return _rng.random() < settings.mock_error_rate
+
+
+def _begin_call() -> float:
+    latency = _sample_latency()
+    if _should_fail():
+        raise MockBackendError("Injected mock backend failure")
+    return latency
+
+
+def mock_text(prompt: str, context: str) -> str:
+    rng = _content_rng(prompt, context)
+    words = [rng.choice(MOCK_VOCABULARY) for _ in range(settings.mock_llm_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def _token_delay() -> float:
+    rate = settings.mock_llm_tokens_per_second
+    return 1 / rate if rate > 0 else 0.0
+
+
+class MockProvider:
+    name = "mock"
+
+    def __init__(self) -> None:
+        self.model = "mock"
+        self.temperature = None
+
+    def generate(self, prompt: str, context: str) -> str:
+        latency = _begin_call()
+        text = mock_text(prompt, context)
+        time.sleep(latency + _token_delay() * len(text.split()))
+        return text
+
+    async def agenerate(self, prompt: str, context: str) -> str:
+        latency = _begin_call()
+        text = mock_text(prompt, context)
+        await asyncio.sleep(latency + _token_delay() * len(text.split()))
+        return text
+
+    def stream(self, prompt: str, context: str) -> Iterator[str]:
+        time.sleep(_begin_call())
+        delay = _token_delay()
+        for index, word in enumerate(mock_text(prompt, context).split(" ")):
+            time.sleep(delay)
+            yield word if index == 0 else f" {word}"
+
+    async def astream(self, prompt: str, context: str) -> AsyncIterator[str]:
+        await asyncio.sleep(_begin_call())
+        delay = _token_delay()
+        for index, word in enumerate(mock_text(prompt, context).split(" ")):
+            await asyncio.sleep(delay)
+            yield word if index == 0 else f" {word}"
+
+
+def synthesize_mock_wav(text: str, output_path: str) -> None:
+    latency = _begin_call()
+    rate = settings.mock_tts_sample_rate
+    duration = max(len(text), 1) / settings.mock_tts_chars_per_second
+    frequency = 220 + _content_rng(text).randrange(440)
+    second = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * frequency * index / rate))) for index in range(rate)
+    )
+    sample_count = int(duration * rate)
+    frames = second * (sample_count // rate) + second[: (sample_count % rate) * 2]
+    time.sleep(latency + duration * settings.mock_tts_realtime_factor)
+    with wave.open(output_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
@@ -0,0 +1,78 @@
+import mmap
+import os
+from array import array
+from typing import Iterable, Iterator
+from app.core.config import settings
+
+
+def _store_paths(book_id: int) -> tuple[str, str]:
+    base = os.path.join(settings.text_dir, str(book_id))
+    return f"{base}.txt", f"{base}.idx"
+
+
+def write_page_texts(book_id: int, page_texts: Iterable[str]) -> None:
+    os.makedirs(settings.text_dir, exist_ok=True)
+    text_path, index_path = _store_paths(book_id)
+    offsets = array("Q", [0])
+    with open(f"{text_path}.tmp", "wb") as f:
+        for text in page_texts:
+            data = text.encode("utf-8")
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    with open(f"{index_path}.tmp", "wb") as f:
+        offsets.tofile(f)
+    os.replace(f"{text_path}.tmp", text_path)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def delete_page_texts(book_id: int) -> None:
+    for path in _store_paths(book_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class PageTextStore:
+    def __init__(self, book_id: int) -> None:
+        text_path, index_path = _store_paths(book_id)
+        self._offsets = array("Q")
+        with open(index_path, "rb") as f:
+            self._offsets.frombytes(f.read())
+        self._file = open(text_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    @classmethod
+    def open(cls, book_id: int) -> "PageTextStore | None":
+        if not all(os.path.exists(path) for path in _store_paths(book_id)):
+            return None
+        return cls(book_id)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._offsets) - 1
+
+    def page_bytes(self, start: int, end: int) -> memoryview:
+        start = min(max(start, 1), self.page_count + 1)
+        end = min(max(end, start - 1), self.page_count)
+        if self._mmap is None:
+            return memoryview(b"")
+        return memoryview(self._mmap)[self._offsets[start - 1] : self._offsets[end]]
+
+    def page_text(self, page: int) -> str:
+        with self.page_bytes(page, page) as view:
+            return str(view, "utf-8")
+
+    def iter_pages(self, start: int, end: int) -> Iterator[str]:
+        for page in range(max(start, 1), min(end, self.page_count) + 1):
+            yield self.page_text(page)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "PageTextStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
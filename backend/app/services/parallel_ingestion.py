@@ -0,0 +1,63 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import fitz
+from app.core.config import settings
+from app.services.image_extraction import extract_images
+from app.services.section_tree import extract_page_texts
+
+logger = logging.getLogger(__name__)
+
+
+def shard_page_ranges(page_count: int, shard_size: int) -> list[tuple[int, int]]:
+    shard_size = max(1, shard_size)
+    return [(start, min(start + shard_size - 1, page_count)) for start in range(1, page_count + 1, shard_size)]
+
+
+def _process_shard(file_path: str, book_id: int, first_page: int, last_page: int) -> tuple[list[str], list[dict]]:
+    doc = fitz.open(file_path)
+    try:
+        page_texts = extract_page_texts(doc, first_page, last_page)
+        assets = extract_images(doc, book_id, first_page, last_page)
+    finally:
+        doc.close()
+    return page_texts, assets
+
+
+def worker_count(workers: int | None = None) -> int:
+    return workers or settings.ingest_workers or os.cpu_count() or 1
+
+
+def should_shard(page_count: int) -> bool:
+    return (
+        settings.ingest_parallel
+        and page_count >= max(settings.ingest_parallel_min_pages, settings.ingest_shard_size + 1)
+        and worker_count() > 1
+    )
+
+
+def extract_sharded(
+    file_path: str,
+    book_id: int,
+    page_count: int,
+    shard_size: int | None = None,
+    workers: int | None = None,
+) -> tuple[list[str], list[dict]]:
+    shards = shard_page_ranges(page_count, shard_size or settings.ingest_shard_size)
+    max_workers = min(len(shards), worker_count(workers))
+    logger.info("Sharded ingestion", extra={"book_id": book_id, "shards": len(shards), "workers": max_workers})
+
+    page_texts: list[str] = []
+    assets: list[dict] = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(_process_shard, file_path, book_id, first_page, last_page)
+            for first_page, last_page in shards
+        ]
+        for future in futures:
+            shard_texts, shard_assets = future.result()
+            page_texts.extend(shard_texts)
+            assets.extend(shard_assets)
+    return page_texts, assets
@@ -1,14 +1,65 @@
+import hashlib
 import logging
 import os
+import uuid
+import anyio
 import fitz
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models import Book, Section, SectionAsset, ReadingProgress
-from app.services.section_tree import build_sections_from_toc, infer_sections_from_headings, compute_page_ranges
+from app.services.section_tree import (
+    build_sections_from_toc,
+    extract_page_texts,
+    find_heading_sections,
+    compute_page_ranges,
+    compute_parent_indexes,
+    full_document_sections,
+    SectionNode,
+)
 from app.services.image_extraction import extract_images
+from app.services.parallel_ingestion import extract_sharded, should_shard
+from app.services.section_index import PageSectionIndex
+from app.services.page_text_store import write_page_texts
 
 logger = logging.getLogger(__name__)
 
+PDF_HEADER = b"%PDF-"
+
+
+def insert_section_tree(db: Session, book_id: int, ranges: list[tuple[SectionNode, int, int]]) -> list[int]:
+    parents = compute_parent_indexes([node for node, _, _ in ranges])
+    by_depth: list[list[int]] = []
+    depths: list[int] = []
+    for idx, parent in enumerate(parents):
+        depth = 0 if parent is None else depths[parent] + 1
+        depths.append(depth)
+        if depth == len(by_depth):
+            by_depth.append([])
+        by_depth[depth].append(idx)
+
+    section_ids: list[int] = [0] * len(ranges)
+    statement = insert(Section).returning(Section.id, sort_by_parameter_order=True)
+    for batch in by_depth:
+        rows = []
+        for idx in batch:
+            node, start, end = ranges[idx]
+            parent = parents[idx]
+            rows.append(
+                {
+                    "book_id": book_id,
+                    "parent_id": section_ids[parent] if parent is not None else None,
+                    "level": node.level,
+                    "title": node.title,
+                    "sort_order": idx + 1,
+                    "page_start": start,
+                    "page_end": end,
+                }
+            )
+        for idx, section_id in zip(batch, db.execute(statement, rows).scalars()):
+            section_ids[idx] = section_id
+    return section_ids
+
 
 def ingest_pdf(db: Session, book_id: int) -> None:
     book = db.get(Book, book_id)
@@ -17,49 +68,31 @@ def ingest_pdf(db: Session, book_id: int) -> None:
 
     doc = fitz.open(book.file_path)
     toc_nodes = build_sections_from_toc(doc)
+    if should_shard(doc.page_count):
+        page_texts, assets = extract_sharded(book.file_path, book_id, doc.page_count)
+    else:
+        page_texts = extract_page_texts(doc)
+        assets = extract_images(doc, book_id)
+    write_page_texts(book_id, page_texts)
     if not toc_nodes:
         logger.info("No TOC found; inferring sections")
-        toc_nodes = infer_sections_from_headings(doc)
+        toc_nodes = find_heading_sections(page_texts) or full_document_sections()
 
     ranges = compute_page_ranges(toc_nodes, doc.page_count)
+    section_ids = insert_section_tree(db, book_id, ranges)
 
-    section_stack: list[Section] = []
-    for sort_order, (node, start, end) in enumerate(ranges, start=1):
-        while section_stack and section_stack[-1].level >= node.level:
-            section_stack.pop()
-        parent_id = section_stack[-1].id if section_stack else None
-        section = Section(
+    page_index = PageSectionIndex.from_ranges(ranges, section_ids)
+    db.add_all(
+        SectionAsset(
             book_id=book_id,
-            parent_id=parent_id,
-            level=node.level,
-            title=node.title,
-            sort_order=sort_order,
-            page_start=start,
-            page_end=end,
-        )
-        db.add(section)
-        db.flush()
-        section_stack.append(section)
-
-    assets = extract_images(doc, book_id)
-    sections = db.query(Section).filter(Section.book_id == book_id).all()
-    for asset in assets:
-        section_id = None
-        best_level = -1
-        for section in sections:
-            if section.page_start <= asset["page_num"] <= section.page_end:
-                if section.level >= best_level:
-                    best_level = section.level
-                    section_id = section.id
-        db.add(
-            SectionAsset(
-                book_id=book_id,
-                section_id=section_id,
-                page_num=asset["page_num"],
-                file_path=asset["file_path"],
-                caption=asset["caption"],
-            )
+            section_id=page_index.lookup(asset["page_num"]),
+            page_num=asset["page_num"],
+            file_path=asset["file_path"],
+            format=asset["format"],
+            caption=asset["caption"],
         )
+        for asset in assets
+    )
 
     existing_progress = db.query(ReadingProgress).filter(ReadingProgress.book_id == book_id).first()
     if not existing_progress:
@@ -70,10 +103,46 @@ def ingest_pdf(db: Session, book_id: int) -> None:
     logger.info("Ingestion complete", extra={"book_id": book_id})
 
 
-def save_pdf_file(book_id: int, filename: str, data: bytes) -> str:
+def _write_chunk(f, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    f.write(chunk)
+
+
+async def save_pdf_upload(upload) -> tuple[str, str, int]:
     os.makedirs(settings.pdf_dir, exist_ok=True)
+    tmp_path = os.path.join(settings.pdf_dir, f".upload-{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            while chunk := await upload.read(settings.upload_chunk_size):
+                if not size and PDF_HEADER not in chunk[:1024]:
+                    raise ValueError("File is not a valid PDF")
+                await anyio.to_thread.run_sync(_write_chunk, f, digest, chunk)
+                size += len(chunk)
+        if not size:
+            raise ValueError("Uploaded file is empty")
+    except BaseException:
+        discard_upload(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), size
+
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(settings.upload_chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def discard_upload(tmp_path: str) -> None:
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def store_pdf_file(tmp_path: str, book_id: int, filename: str) -> str:
     safe_name = filename.replace(" ", "_")
     file_path = os.path.join(settings.pdf_dir, f"{book_id}_{safe_name}")
-    with open(file_path, "wb") as f:
-        f.write(data)
+    os.replace(tmp_path, file_path)
     return file_path
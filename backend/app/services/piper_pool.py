@@ -0,0 +1,130 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import select
+import subprocess
+import tempfile
+import threading
+import time
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: "PiperPool | None" = None
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+class PiperWorker:
+    def __init__(self, piper_bin: str, model: str) -> None:
+        self.piper_bin = piper_bin
+        self.model = model
+        self.process: subprocess.Popen | None = None
+        self._buffer = b""
+
+    def _start(self) -> subprocess.Popen:
+        cmd = [self.piper_bin, "--model", self.model, "--json-input", "--output_dir", tempfile.gettempdir()]
+        logger.info("Starting Piper worker", extra={"model": self.model})
+        self._buffer = b""
+        return subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def _ensure_running(self) -> subprocess.Popen:
+        if self.process is None or self.process.poll() is not None:
+            self.process = self._start()
+        return self.process
+
+    def _read_line(self, process: subprocess.Popen, deadline: float) -> bytes:
+        fd = process.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Piper worker timed out")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise BrokenPipeError("Piper worker exited")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line
+
+    def _request(self, text: str, output_path: str) -> None:
+        process = self._ensure_running()
+        process.stdin.write((json.dumps({"text": text, "output_file": output_path}) + "\n").encode("utf-8"))
+        process.stdin.flush()
+        deadline = time.monotonic() + settings.piper_timeout
+        while self._read_line(process, deadline).strip().decode("utf-8", "replace") != output_path:
+            pass
+        if not os.path.exists(output_path):
+            raise RuntimeError("Piper worker produced no audio")
+
+    def synthesize(self, text: str, output_path: str) -> None:
+        try:
+            self._request(text, output_path)
+        except (OSError, RuntimeError):
+            logger.warning("Piper worker failed; restarting", exc_info=True)
+            self.stop(force=True)
+            try:
+                self._request(text, output_path)
+            except (OSError, RuntimeError):
+                self.stop(force=True)
+                raise
+
+    def stop(self, force: bool = False) -> None:
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            if force:
+                process.kill()
+            else:
+                process.stdin.close()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        for stream in (process.stdin, process.stdout):
+            if not stream.closed:
+                stream.close()
+
+
+class PiperPool:
+    def __init__(self, piper_bin: str, model: str, size: int) -> None:
+        self._workers: queue.Queue[PiperWorker] = queue.Queue()
+        self._all = [PiperWorker(piper_bin, model) for _ in range(size)]
+        for worker in self._all:
+            self._workers.put(worker)
+
+    def synthesize(self, text: str, output_path: str) -> None:
+        worker = self._workers.get()
+        try:
+            worker.synthesize(" ".join(text.split()), output_path)
+        finally:
+            self._workers.put(worker)
+
+    def close(self) -> None:
+        for worker in self._all:
+            worker.stop()
+
+
+def get_piper_pool() -> PiperPool | None:
+    global _pool, _pool_pid
+    if settings.piper_pool_size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = PiperPool(settings.piper_bin, settings.piper_model, settings.piper_pool_size)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _close_pool() -> None:
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.close()
+
+
+atexit.register(_close_pool)
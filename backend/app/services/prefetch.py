@@ -0,0 +1,81 @@
+import logging
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Section, Summary, SummaryVersion
+from app.services.section_index import get_page_index
+from app.workers.rq_queue import get_queue, get_redis, singleflight_active, try_enqueue_once
+from app.workers import tasks
+
+logger = logging.getLogger(__name__)
+
+BUDGET_WINDOW_SECONDS = 24 * 3600
+
+
+def _budget_key(book_id: int) -> str:
+    return f"prefetch:budget:{book_id}"
+
+
+def _position_key(book_id: int) -> str:
+    return f"prefetch:position:{book_id}"
+
+
+def _summarized_ids(db: Session, section_ids: list[int]) -> set[int]:
+    rows = (
+        db.query(Summary.section_id)
+        .join(SummaryVersion, SummaryVersion.summary_id == Summary.id)
+        .filter(Summary.section_id.in_(section_ids))
+        .distinct()
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+def prefetch_for_page(db: Session, book_id: int, page: int) -> list[str]:
+    if not settings.prefetch_enabled:
+        return []
+    section_id = get_page_index(db, book_id).lookup(page)
+    if section_id is None:
+        return []
+
+    redis_conn = get_redis()
+    if redis_conn.getset(_position_key(book_id), section_id) == str(section_id).encode():
+        return []
+    redis_conn.expire(_position_key(book_id), BUDGET_WINDOW_SECONDS)
+
+    current = db.get(Section, section_id)
+    candidates = [
+        row[0]
+        for row in db.query(Section.id)
+        .filter(Section.book_id == book_id, Section.sort_order >= current.sort_order)
+        .order_by(Section.sort_order)
+        .limit(settings.prefetch_ahead + 1)
+        .all()
+    ]
+    summarized = _summarized_ids(db, candidates)
+    pending = [candidate for candidate in candidates if candidate not in summarized]
+
+    queue = get_queue("low")
+    budget_key = _budget_key(book_id)
+    job_ids = []
+    for candidate in pending:
+        if any(
+            singleflight_active(f"summary:{candidate}:{recursive}:{hierarchical}:{regenerate}", redis_conn)
+            for recursive in (False, True)
+            for hierarchical in (False, True)
+            for regenerate in (False, True)
+        ):
+            continue
+        if int(redis_conn.get(budget_key) or 0) >= settings.prefetch_budget_per_book:
+            logger.info("Prefetch budget exhausted", extra={"book_id": book_id})
+            break
+        job_id, created = try_enqueue_once(
+            f"prefetch:{candidate}",
+            tasks.prefetch_section_job,
+            candidate,
+            settings.prefetch_tts,
+            queue=queue,
+        )
+        if created and redis_conn.incr(budget_key) == 1:
+            redis_conn.expire(budget_key, BUDGET_WINDOW_SECONDS)
+        job_ids.append(job_id)
+    return job_ids
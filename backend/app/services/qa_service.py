@@ -1,15 +1,44 @@
+import asyncio
 import logging
+from typing import AsyncIterator
+from app.core.config import settings
 from app.services.llm_providers import get_provider
 
 logger = logging.getLogger(__name__)
 
+QA_PROMPT = (
+    "You are a helpful tutor. Answer the user's question using only the provided book excerpt. "
+    "Keep the answer concise, clear, and friendly for TTS. If the excerpt doesn't contain the answer, "
+    "say you cannot find it in the provided text."
+)
 
-def answer_question(selection_text: str, question: str) -> str:
-    prompt = (
-        "You are a helpful tutor. Answer the user's question using only the provided book excerpt. "
-        "Keep the answer concise, clear, and friendly for TTS. If the excerpt doesn't contain the answer, "
-        "say you cannot find it in the provided text."
-    )
-    context = f"Excerpt:\n{selection_text}\n\nQuestion:\n{question}"
-    provider = get_provider()
-    return provider.generate(prompt, context)
+_qa_semaphore: asyncio.Semaphore | None = None
+
+
+def _qa_context(selection_text: str, question: str) -> str:
+    return f"Excerpt:\n{selection_text}\n\nQuestion:\n{question}"
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _qa_semaphore
+    if _qa_semaphore is None:
+        _qa_semaphore = asyncio.Semaphore(settings.qa_max_concurrency)
+    return _qa_semaphore
+
+
+def answer_question(selection_text: str, question: str, use_cache: bool = True) -> str:
+    provider = get_provider(use_cache)
+    return provider.generate(QA_PROMPT, _qa_context(selection_text, question))
+
+
+async def aanswer_question(selection_text: str, question: str, use_cache: bool = True) -> str:
+    provider = get_provider(use_cache)
+    async with _get_semaphore():
+        return await provider.agenerate(QA_PROMPT, _qa_context(selection_text, question))
+
+
+async def astream_answer(selection_text: str, question: str, use_cache: bool = True) -> AsyncIterator[str]:
+    provider = get_provider(use_cache)
+    async with _get_semaphore():
+        async for token in provider.astream(QA_PROMPT, _qa_context(selection_text, question)):
+            yield token
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import Book, Section
+from app.services.section_tree import SectionNode
+
+_index_cache: dict[int, tuple[tuple, "PageSectionIndex"]] = {}
+
+
+@dataclass(frozen=True)
+class SectionSpan:
+    section_id: int
+    level: int
+    sort_order: int
+    page_start: int
+    page_end: int
+
+
+class PageSectionIndex:
+    def __init__(self, spans: list[SectionSpan]) -> None:
+        page_count = max((span.page_end for span in spans), default=0)
+        self._pages: list[int | None] = [None] * (page_count + 1)
+        for span in sorted(spans, key=lambda span: (span.level, span.sort_order)):
+            start = max(1, span.page_start)
+            if span.page_end >= start:
+                self._pages[start : span.page_end + 1] = [span.section_id] * (span.page_end - start + 1)
+
+    @classmethod
+    def from_ranges(cls, ranges: list[tuple[SectionNode, int, int]], section_ids: list[int]) -> "PageSectionIndex":
+        spans = [
+            SectionSpan(section_id, node.level, sort_order, start, end)
+            for sort_order, ((node, start, end), section_id) in enumerate(zip(ranges, section_ids), start=1)
+        ]
+        return cls(spans)
+
+    @classmethod
+    def from_db(cls, db: Session, book_id: int) -> "PageSectionIndex":
+        rows = (
+            db.query(Section.id, Section.level, Section.sort_order, Section.page_start, Section.page_end)
+            .filter(Section.book_id == book_id)
+            .all()
+        )
+        return cls([SectionSpan(*row) for row in rows])
+
+    def __bool__(self) -> bool:
+        return any(section_id is not None for section_id in self._pages)
+
+    def lookup(self, page: int) -> int | None:
+        if 1 <= page < len(self._pages):
+            return self._pages[page]
+        return None
+
+
+def _index_fingerprint(db: Session, book_id: int) -> tuple | None:
+    row = (
+        db.query(Book.created_at, func.count(Section.id), func.min(Section.id), func.max(Section.id))
+        .outerjoin(Section, Section.book_id == Book.id)
+        .filter(Book.id == book_id)
+        .group_by(Book.id)
+        .first()
+    )
+    return tuple(row) if row else None
+
+
+def get_page_index(db: Session, book_id: int) -> PageSectionIndex:
+    fingerprint = _index_fingerprint(db, book_id)
+    cached = _index_cache.get(book_id)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    index = PageSectionIndex.from_db(db, book_id)
+    if index:
+        _index_cache[book_id] = (fingerprint, index)
+    else:
+        _index_cache.pop(book_id, None)
+    return index
+
+
+def invalidate_page_index(book_id: int) -> None:
+    _index_cache.pop(book_id, None)
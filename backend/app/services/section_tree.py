@@ -2,6 +2,8 @@ import re
 from dataclasses import dataclass
 import fitz
 
+HEADING_PATTERN = re.compile(r"^(chapter|CHAPTER|Chapter)\s+\d+|^\d+\.\s+|^[A-Z][A-Z\s]{8,}$")
+
 
 @dataclass
 class SectionNode:
@@ -21,30 +23,47 @@ def build_sections_from_toc(doc: fitz.Document) -> list[SectionNode]:
     return sections
 
 
-def infer_sections_from_headings(doc: fitz.Document) -> list[SectionNode]:
-    pattern = re.compile(r"^(chapter|CHAPTER|Chapter)\s+\d+|^\d+\.\s+|^[A-Z][A-Z\s]{8,}$")
+def extract_page_texts(doc: fitz.Document, first_page: int = 1, last_page: int | None = None) -> list[str]:
+    last_page = doc.page_count if last_page is None else last_page
+    return [doc.load_page(page_index).get_text("text") for page_index in range(first_page - 1, last_page)]
+
+
+def find_heading_sections(page_texts: list[str], first_page: int = 1) -> list[SectionNode]:
     sections: list[SectionNode] = []
-    for page_index in range(doc.page_count):
-        page = doc.load_page(page_index)
-        text = page.get_text("text")
+    for page_num, text in enumerate(page_texts, start=first_page):
         lines = [line.strip() for line in text.splitlines() if line.strip()]
         for line in lines[:10]:
-            if pattern.match(line):
-                sections.append(SectionNode(level=1, title=line, page=page_index + 1))
+            if HEADING_PATTERN.match(line):
+                sections.append(SectionNode(level=1, title=line, page=page_num))
                 break
-    if not sections:
-        sections.append(SectionNode(level=1, title="Full Document", page=1))
     return sections
 
 
+def full_document_sections() -> list[SectionNode]:
+    return [SectionNode(level=1, title="Full Document", page=1)]
+
+
+def infer_sections_from_headings(doc: fitz.Document) -> list[SectionNode]:
+    return find_heading_sections(extract_page_texts(doc)) or full_document_sections()
+
+
 def compute_page_ranges(nodes: list[SectionNode], page_count: int) -> list[tuple[SectionNode, int, int]]:
-    ranges: list[tuple[SectionNode, int, int]] = []
+    ends = [page_count] * len(nodes)
+    open_nodes: list[int] = []
     for idx, node in enumerate(nodes):
-        start = node.page
-        end = page_count
-        for next_node in nodes[idx + 1 :]:
-            if next_node.level <= node.level:
-                end = max(start, next_node.page - 1)
-                break
-        ranges.append((node, start, end))
-    return ranges
+        while open_nodes and nodes[open_nodes[-1]].level >= node.level:
+            closed = open_nodes.pop()
+            ends[closed] = max(nodes[closed].page, node.page - 1)
+        open_nodes.append(idx)
+    return [(node, node.page, end) for node, end in zip(nodes, ends)]
+
+
+def compute_parent_indexes(nodes: list[SectionNode]) -> list[int | None]:
+    parents: list[int | None] = []
+    stack: list[int] = []
+    for idx, node in enumerate(nodes):
+        while stack and nodes[stack[-1]].level >= node.level:
+            stack.pop()
+        parents.append(stack[-1] if stack else None)
+        stack.append(idx)
+    return parents
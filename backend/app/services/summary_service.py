@@ -1,10 +1,13 @@
 import logging
-from typing import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Callable, Iterable, Iterator
 import fitz
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models import Book, Section, Summary, SummaryVersion, SectionAsset
-from app.services.llm_providers import get_provider
+from app.services.llm_providers import LLMProvider, get_provider
+from app.services.page_text_store import PageTextStore
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +25,11 @@ Key Takeaways
 Figures
 """
 
+CHUNK_SUMMARY_PROMPT = """You are summarizing one part of a longer book section strictly from the provided text. Do not invent details.
+List the key ideas, definitions, formulas, code and examples from this part in short plain sentences.
+Keep the order in which they appear. Do not add an introduction or a conclusion.
+"""
+
 
 def _collect_descendants(section: Section) -> list[Section]:
     nodes = [section]
@@ -33,15 +41,69 @@ def _collect_descendants(section: Section) -> list[Section]:
     return result
 
 
-def _extract_text(book_path: str, page_ranges: Iterable[tuple[int, int]]) -> str:
-    doc = fitz.open(book_path)
-    parts = []
-    for start, end in page_ranges:
-        for page_index in range(start - 1, end):
-            page = doc.load_page(page_index)
-            parts.append(page.get_text("text"))
-    doc.close()
-    return "\n".join(parts)
+def _iter_page_texts(book: Book, page_ranges: Iterable[tuple[int, int]]) -> Iterator[str]:
+    store = PageTextStore.open(book.id)
+    if store is not None:
+        with store:
+            for start, end in page_ranges:
+                yield from store.iter_pages(start, end)
+        return
+    doc = fitz.open(book.file_path)
+    try:
+        for start, end in page_ranges:
+            for page_index in range(start - 1, end):
+                yield doc.load_page(page_index).get_text("text")
+    finally:
+        doc.close()
+
+
+def _extract_text(book: Book, page_ranges: Iterable[tuple[int, int]], limit: int) -> tuple[str, bool]:
+    parts: list[str] = []
+    size = 0
+    with closing(_iter_page_texts(book, page_ranges)) as pages:
+        for text in pages:
+            size += len(text) + (1 if parts else 0)
+            parts.append(text)
+            if size > limit:
+                return "\n".join(parts)[:limit], True
+    return "\n".join(parts), False
+
+
+def _split_chunks(text: str, size: int) -> list[str]:
+    chunks: list[str] = []
+    current: list[str] = []
+    current_len = 0
+    for line in text.splitlines(keepends=True):
+        if current and current_len + len(line) > size:
+            chunks.append("".join(current))
+            current, current_len = [], 0
+        while len(line) > size:
+            chunks.append(line[:size])
+            line = line[size:]
+        current.append(line)
+        current_len += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _summarize_chunks(provider: LLMProvider, title: str, chunks: list[str]) -> list[str]:
+    contexts = [
+        f"Section Title: {title}\n\nPart {idx} of {len(chunks)}:\n{chunk}" for idx, chunk in enumerate(chunks, start=1)
+    ]
+    workers = max(1, min(settings.summary_map_concurrency, len(contexts)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda context: provider.generate(CHUNK_SUMMARY_PROMPT, context), contexts))
+
+
+def _condense_text(provider: LLMProvider, title: str, text: str) -> str:
+    while len(text) > settings.max_summary_chars:
+        chunks = _split_chunks(text, settings.summary_chunk_chars)
+        condensed = "\n\n".join(_summarize_chunks(provider, title, chunks))
+        if len(condensed) >= len(text):
+            return condensed[: settings.max_summary_chars]
+        text = condensed
+    return text
 
 
 def _collect_image_context(db: Session, section_ids: list[int]) -> str:
@@ -57,7 +119,98 @@ def _collect_image_context(db: Session, section_ids: list[int]) -> str:
     return "\n".join(lines)
 
 
-def generate_summary(db: Session, section_id: int, recursive: bool) -> tuple[SummaryVersion | None, str | None, str | None]:
+def _generate(provider: LLMProvider, prompt: str, context: str, on_token: Callable[[str], None] | None) -> str:
+    if on_token is None:
+        return provider.generate(prompt, context)
+    parts = []
+    for token in provider.stream(prompt, context):
+        parts.append(token)
+        on_token(token)
+    return "".join(parts).strip()
+
+
+def _prepare_text(provider: LLMProvider, title: str, text: str) -> tuple[str, str]:
+    if settings.summary_map_reduce and len(text) > settings.max_summary_chars:
+        return "Notes extracted from consecutive parts of the section text", _condense_text(provider, title, text)
+    return "Extracted Text", text[: settings.max_summary_chars]
+
+
+def _latest_version(db: Session, section_id: int) -> SummaryVersion | None:
+    return (
+        db.query(SummaryVersion)
+        .join(Summary, SummaryVersion.summary_id == Summary.id)
+        .filter(Summary.section_id == section_id)
+        .order_by(SummaryVersion.version_number.desc())
+        .first()
+    )
+
+
+def _save_version(db: Session, section_id: int, content: str) -> SummaryVersion:
+    summary = db.query(Summary).filter(Summary.section_id == section_id).first()
+    if not summary:
+        summary = Summary(section_id=section_id)
+        db.add(summary)
+        db.flush()
+
+    latest_version = (
+        db.query(SummaryVersion)
+        .filter(SummaryVersion.summary_id == summary.id)
+        .order_by(SummaryVersion.version_number.desc())
+        .first()
+    )
+    next_version = 1 if not latest_version else latest_version.version_number + 1
+    version = SummaryVersion(summary_id=summary.id, version_number=next_version, content=content)
+    db.add(version)
+    db.commit()
+    db.refresh(version)
+    return version
+
+
+def _compose_summary(
+    db: Session,
+    provider: LLMProvider,
+    book: Book,
+    section: Section,
+    on_token: Callable[[str], None] | None = None,
+) -> str:
+    children = sorted(section.children, key=lambda child: child.sort_order)
+    child_parts = []
+    for child in children:
+        latest = _latest_version(db, child.id)
+        if latest is None:
+            latest = _save_version(db, child.id, _compose_summary(db, provider, book, child))
+        child_parts.append(f"Subsection: {child.title}\n{latest.content}")
+
+    intro_end = min([child.page_start for child in children], default=section.page_end + 1) - 1
+    intro_text = ""
+    if intro_end >= section.page_start:
+        limit = settings.summary_map_max_chars if settings.summary_map_reduce else settings.max_summary_chars
+        intro_text, _ = _extract_text(book, [(section.page_start, intro_end)], limit)
+
+    if not child_parts:
+        text_label, text = _prepare_text(provider, section.title, intro_text)
+    else:
+        text_label = "Summaries of the subsections, in reading order"
+        text = _condense_text(provider, section.title, "\n\n".join(child_parts))
+        if intro_text.strip():
+            text = f"Introduction:\n{intro_text[: settings.max_summary_chars // 4]}\n\n{text}"
+
+    context = (
+        f"Section Title: {section.title}\n\n"
+        f"{text_label}:\n{text}\n\n"
+        f"Figures referenced in this section:\n{_collect_image_context(db, [section.id])}"
+    )
+    return _generate(provider, SUMMARY_TEMPLATE, context, on_token)
+
+
+def generate_summary(
+    db: Session,
+    section_id: int,
+    recursive: bool,
+    hierarchical: bool = False,
+    use_cache: bool = True,
+    on_token: Callable[[str], None] | None = None,
+) -> tuple[SummaryVersion | None, str | None, str | None]:
     section = db.get(Section, section_id)
     if not section:
         raise ValueError("Section not found")
@@ -65,15 +218,20 @@ def generate_summary(db: Session, section_id: int, recursive: bool) -> tuple[Sum
     if not book:
         raise ValueError("Book not found")
 
+    if recursive and hierarchical:
+        content = _compose_summary(db, get_provider(use_cache), book, section, on_token)
+        return _save_version(db, section_id, content), None, None
+
     target_sections = _collect_descendants(section) if recursive else [section]
     page_ranges = [(sec.page_start, sec.page_end) for sec in target_sections]
-    text = _extract_text(book.file_path, page_ranges)
+    limit = settings.summary_map_max_chars if settings.summary_map_reduce else settings.large_content_threshold
+    text, exceeded = _extract_text(book, page_ranges, limit)
 
-    if len(text) > settings.large_content_threshold:
+    if exceeded:
         warning = (
             "Section text is large. Consider summarizing at a smaller subtopic level for higher fidelity."
         )
-        provider = get_provider()
+        provider = get_provider(use_cache)
         overview_prompt = (
             "You are allowed to provide a high-level overview from your own knowledge. "
             "Clearly label it as NOT derived from the book content."
@@ -82,35 +240,15 @@ def generate_summary(db: Session, section_id: int, recursive: bool) -> tuple[Sum
         return None, warning, (
             "This overview is generated from the model's knowledge, not directly from the book.\n\n" + overview
         )
-    if len(text) > settings.max_summary_chars:
-        text = text[: settings.max_summary_chars]
 
+    provider = get_provider(use_cache)
+    text_label, text = _prepare_text(provider, section.title, text)
     image_context = _collect_image_context(db, [sec.id for sec in target_sections])
     prompt = SUMMARY_TEMPLATE
     context = (
         f"Section Title: {section.title}\n\n"
-        f"Extracted Text:\n{text}\n\n"
+        f"{text_label}:\n{text}\n\n"
         f"Figures referenced in this section:\n{image_context}"
     )
-    provider = get_provider()
-    content = provider.generate(prompt, context)
-
-    summary = db.query(Summary).filter(Summary.section_id == section_id).first()
-    if not summary:
-        summary = Summary(section_id=section_id)
-        db.add(summary)
-        db.flush()
-
-    latest_version = (
-        db.query(SummaryVersion)
-        .filter(SummaryVersion.summary_id == summary.id)
-        .order_by(SummaryVersion.version_number.desc())
-        .first()
-    )
-    next_version = 1 if not latest_version else latest_version.version_number + 1
-    version = SummaryVersion(summary_id=summary.id, version_number=next_version, content=content)
-    db.add(version)
-    db.commit()
-    db.refresh(version)
-
-    return version, None, None
+    content = _generate(provider, prompt, context, on_token)
+    return _save_version(db, section_id, content), None, None
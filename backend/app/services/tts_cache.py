@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESCAN_SECONDS = 600
+
+_cache: "TTSAudioCache | None" = None
+_cache_lock = threading.Lock()
+
+
+def _voice(backend: str) -> str:
+    if backend == "piper":
+        model = os.path.abspath(settings.piper_model or "")
+        try:
+            stat = os.stat(model)
+        except OSError:
+            return model
+        return f"{model}:{stat.st_size}:{stat.st_mtime_ns}"
+    if backend == "mock":
+        return f"seed{settings.mock_seed}"
+    return ""
+
+
+class TTSAudioCache:
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._bytes: int | None = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+
+    def key(self, backend: str, sentence: str) -> str:
+        parts = (backend, _voice(backend), settings.tts_lang, " ".join(sentence.split()))
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{fmt}")
+
+    def fetch(self, key: str, fmt: str, output_path: str) -> bool:
+        path = self._path(key, fmt)
+        try:
+            shutil.copyfile(path, output_path)
+        except FileNotFoundError:
+            return False
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def store(self, key: str, fmt: str, source_path: str) -> None:
+        path = self._path(key, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += size
+
+    def maybe_prune(self) -> int:
+        with self._lock:
+            due = (
+                self._bytes is None
+                or self._bytes > self.max_bytes
+                or time.monotonic() - self._scanned_at > RESCAN_SECONDS
+            )
+        return self.prune() if due else 0
+
+    def prune(self) -> int:
+        entries = []
+        total = 0
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        removed = 0
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                else:
+                    removed += 1
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            logger.info("Pruned TTS cache", extra={"removed": removed, "bytes": total})
+        with self._lock:
+            self._bytes = total
+            self._scanned_at = time.monotonic()
+        return removed
+
+
+def get_tts_cache() -> TTSAudioCache | None:
+    global _cache
+    if not settings.tts_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            os.makedirs(settings.tts_cache_dir, exist_ok=True)
+            _cache = TTSAudioCache(settings.tts_cache_dir, settings.tts_cache_max_bytes)
+        return _cache
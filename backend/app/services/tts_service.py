@@ -1,33 +1,76 @@
 import hashlib
+import json
 import logging
 import os
+import re
+import shutil
 import subprocess
+import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from gtts import gTTS
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models import AudioAsset, SummaryVersion
+from app.services.mock_backends import synthesize_mock_wav
+from app.services.piper_pool import get_piper_pool
+from app.services.tts_cache import get_tts_cache
 
 logger = logging.getLogger(__name__)
 
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?:;])\s+|\s*\n\s*")
+PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+AUDIO_MEDIA_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav", "opus": "audio/ogg"}
+TRANSCODE_ARGS = {
+    "opus": ["-c:a", "libopus", "-application", "voip", "-f", "ogg"],
+    "mp3": ["-c:a", "libmp3lame", "-f", "mp3"],
+}
+PARTS_MANIFEST = "manifest.json"
+PARTS_FAILED = "failed"
+
 
 def _hash_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+def audio_dir(book_id: int, section_id: int) -> str:
+    return os.path.join(settings.audio_dir, str(book_id), str(section_id))
+
+
+def audio_parts_dir(dir_path: str, version_id: int) -> str:
+    return os.path.join(dir_path, f"{version_id}.parts")
+
+
 def _ensure_dirs(book_id: int, section_id: int) -> str:
-    path = os.path.join(settings.audio_dir, str(book_id), str(section_id))
+    path = audio_dir(book_id, section_id)
     os.makedirs(path, exist_ok=True)
     return path
 
 
+def _piper_configured() -> bool:
+    return bool(settings.piper_bin and settings.piper_model)
+
+
+def _resolve_backend() -> tuple[str, str]:
+    backend = settings.tts_backend
+    if backend == "piper" and not _piper_configured():
+        if not settings.tts_allow_network:
+            raise RuntimeError("Piper backend requires PIPER_BIN and PIPER_MODEL or enable gTTS fallback")
+        logger.warning("Piper not configured; falling back to gTTS")
+        backend = "gtts"
+    if backend in ("piper", "mock"):
+        return backend, "wav"
+    if backend == "gtts":
+        return backend, "mp3"
+    raise RuntimeError(f"Unsupported TTS backend: {settings.tts_backend}")
+
+
 def _generate_with_piper(text: str, output_path: str) -> None:
-    if not settings.piper_bin or not settings.piper_model:
-        if settings.tts_allow_network:
-            logger.warning("Piper not configured; falling back to gTTS")
-            _generate_with_gtts(text, output_path.replace(".wav", ".mp3"))
-            return
-        raise RuntimeError("Piper backend requires PIPER_BIN and PIPER_MODEL or enable gTTS fallback")
+    pool = get_piper_pool()
+    if pool is not None:
+        pool.synthesize(text, output_path)
+        return
     cmd = [settings.piper_bin, "--model", settings.piper_model, "--output_file", output_path]
     subprocess.run(cmd, input=text.encode("utf-8"), check=True)
 
@@ -39,7 +82,143 @@ def _generate_with_gtts(text: str, output_path: str) -> None:
     tts.save(output_path)
 
 
-def generate_audio(db: Session, version_id: int) -> AudioAsset:
+def _synthesize(backend: str, text: str, output_path: str) -> None:
+    if backend == "piper":
+        _generate_with_piper(text, output_path)
+    elif backend == "gtts":
+        _generate_with_gtts(text, output_path)
+    else:
+        synthesize_mock_wav(text, output_path)
+
+
+def split_tts_chunks(text: str, max_chars: int) -> list[str]:
+    chunks: list[str] = []
+    for paragraph in PARAGRAPH_BOUNDARY.split(text):
+        current = ""
+        for sentence in SENTENCE_BOUNDARY.split(paragraph.strip()):
+            sentence = " ".join(sentence.split())
+            if not sentence:
+                continue
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def concat_audio(part_paths: list[str], fmt: str, output_path: str) -> None:
+    if fmt == "wav":
+        with wave.open(output_path, "wb") as output:
+            for index, part_path in enumerate(part_paths):
+                with wave.open(part_path, "rb") as part:
+                    if index == 0:
+                        output.setparams(part.getparams())
+                    output.writeframes(part.readframes(part.getnframes()))
+        return
+    with open(output_path, "wb") as output:
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, output)
+
+
+def _write_manifest(parts_dir: str, fmt: str, count: int, run_id: str | None) -> None:
+    tmp_path = os.path.join(parts_dir, f"{PARTS_MANIFEST}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"format": fmt, "count": count, "run_id": run_id}, handle)
+    os.replace(tmp_path, os.path.join(parts_dir, PARTS_MANIFEST))
+
+
+def synthesize_text(
+    text: str,
+    backend: str,
+    fmt: str,
+    output_path: str,
+    parts_dir: str | None = None,
+    run_id: str | None = None,
+) -> None:
+    if not text.strip():
+        raise ValueError("No text to synthesize")
+    cache = get_tts_cache()
+    if cache is not None:
+        chunks = split_tts_chunks(text, 0)
+    else:
+        chunks = split_tts_chunks(text, settings.tts_chunk_chars) if settings.tts_chunk_chars > 0 else []
+    if len(chunks) <= 1 and parts_dir is None and cache is None:
+        _synthesize(backend, text, output_path)
+        return
+    chunks = chunks or [text]
+    if parts_dir is None:
+        work_dir = tempfile.mkdtemp(prefix=".tts-", dir=os.path.dirname(output_path))
+    else:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        os.makedirs(parts_dir)
+        work_dir = parts_dir
+        _write_manifest(parts_dir, fmt, len(chunks), run_id)
+
+    def synthesize_part(index: int) -> str:
+        part_path = os.path.join(work_dir, f"{index:04d}.{fmt}")
+        tmp_path = os.path.join(work_dir, f"{index:04d}.tmp.{fmt}")
+        key = cache.key(backend, chunks[index]) if cache is not None else None
+        if key is not None and cache.fetch(key, fmt, tmp_path):
+            cache_hits.append(index)
+        else:
+            _synthesize(backend, chunks[index], tmp_path)
+            if key is not None:
+                cache.store(key, fmt, tmp_path)
+        os.replace(tmp_path, part_path)
+        return part_path
+
+    cache_hits: list[int] = []
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, settings.tts_max_workers)) as pool:
+            part_paths = list(pool.map(synthesize_part, range(len(chunks))))
+        tmp_path = os.path.join(work_dir, f"combined.{fmt}")
+        concat_audio(part_paths, fmt, tmp_path)
+        os.replace(tmp_path, output_path)
+        if cache is not None:
+            logger.info("TTS sentence cache", extra={"hits": len(cache_hits), "sentences": len(chunks)})
+            cache.maybe_prune()
+    except Exception:
+        if parts_dir is not None:
+            with open(os.path.join(parts_dir, PARTS_FAILED), "w", encoding="utf-8") as handle:
+                handle.write(run_id or "")
+        raise
+    finally:
+        if parts_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def transcode_audio(input_path: str, fmt: str) -> str:
+    if fmt not in TRANSCODE_ARGS:
+        raise RuntimeError(f"Unsupported transcode format: {fmt}")
+    output_path = f"{os.path.splitext(input_path)[0]}.{fmt}"
+    tmp_path = f"{output_path}.tmp"
+    cmd = [
+        settings.ffmpeg_bin,
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        input_path,
+        *TRANSCODE_ARGS[fmt],
+        "-b:a",
+        settings.tts_transcode_bitrate,
+        tmp_path,
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def generate_audio(db: Session, version_id: int, run_id: str | None = None) -> AudioAsset:
     version = db.get(SummaryVersion, version_id)
     if not version:
         raise ValueError("Summary version not found")
@@ -57,19 +236,20 @@ def generate_audio(db: Session, version_id: int) -> AudioAsset:
     section_id = version.summary.section_id
     book_id = version.summary.section.book_id
     dir_path = _ensure_dirs(book_id, section_id)
+    parts_dir = audio_parts_dir(dir_path, version_id)
 
-    fmt = "wav" if settings.tts_backend == "piper" else "mp3"
+    backend, fmt = _resolve_backend()
     file_path = os.path.join(dir_path, f"{version_id}.{fmt}")
+    synthesize_text(version.content, backend, fmt, file_path, parts_dir, run_id)
 
-    if settings.tts_backend == "piper":
-        _generate_with_piper(version.content, file_path)
-        if not os.path.exists(file_path):
-            fmt = "mp3"
-            file_path = os.path.join(dir_path, f"{version_id}.{fmt}")
-    elif settings.tts_backend == "gtts":
-        _generate_with_gtts(version.content, file_path)
-    else:
-        raise RuntimeError(f"Unsupported TTS backend: {settings.tts_backend}")
+    source_path = None
+    target = settings.tts_transcode_format.lower()
+    if target and target != fmt:
+        try:
+            source_path, file_path = file_path, transcode_audio(file_path, target)
+            fmt = target
+        except (OSError, RuntimeError, subprocess.CalledProcessError):
+            logger.exception("Audio transcode failed; keeping original", extra={"version_id": version_id})
 
     audio = AudioAsset(
         version_id=version_id,
@@ -81,5 +261,8 @@ def generate_audio(db: Session, version_id: int) -> AudioAsset:
     db.add(audio)
     db.commit()
     db.refresh(audio)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    if source_path is not None:
+        os.remove(source_path)
     logger.info("Audio generated", extra={"version_id": version_id, "file_path": file_path})
     return audio
@@ -1,8 +1,84 @@
+import uuid
 from redis import Redis
-from rq import Queue
+from rq import Callback, Queue
+from rq.job import Job, NoSuchJobError
 from app.core.config import settings
 
+ACTIVE_JOB_STATUSES = {"queued", "started", "deferred", "scheduled"}
+ENQUEUE_GRACE_SECONDS = 5
 
-def get_queue() -> Queue:
-    redis_conn = Redis.from_url(settings.redis_url)
-    return Queue("default", connection=redis_conn, default_timeout=settings.rq_default_timeout)
+
+def get_redis() -> Redis:
+    return Redis.from_url(settings.redis_url)
+
+
+def get_queue(name: str = "default") -> Queue:
+    redis_conn = get_redis()
+    return Queue(name, connection=redis_conn, default_timeout=settings.rq_default_timeout)
+
+
+def job_stream_channel(job_id: str) -> str:
+    return f"job_stream:{job_id}"
+
+
+def book_summary_progress_key(book_id: int) -> str:
+    return f"book_summaries:{book_id}"
+
+
+def _singleflight_key(key: str) -> str:
+    return f"singleflight:{key}"
+
+
+def release_singleflight(job: Job, connection: Redis, *args, **kwargs) -> None:
+    marker = job.meta.get("singleflight_key")
+    if marker and connection.get(marker) == job.id.encode("utf-8"):
+        connection.delete(marker)
+
+
+def try_enqueue_once(
+    key: str, func, *args, queue: Queue | None = None, job_timeout: int | None = None
+) -> tuple[str, bool]:
+    queue = queue or get_queue()
+    redis_conn = queue.connection
+    marker = _singleflight_key(key)
+    marker_ttl = settings.rq_max_queue_wait + (job_timeout or settings.rq_default_timeout)
+    for _ in range(2):
+        job_id = str(uuid.uuid4())
+        if redis_conn.set(marker, job_id, nx=True, ex=marker_ttl):
+            queue.enqueue(
+                func,
+                *args,
+                job_id=job_id,
+                job_timeout=job_timeout,
+                meta={"singleflight_key": marker},
+                on_success=Callback(release_singleflight),
+                on_failure=Callback(release_singleflight),
+            )
+            return job_id, True
+        existing = redis_conn.get(marker)
+        if existing is None:
+            continue
+        existing_id = existing.decode("utf-8")
+        try:
+            status = Job.fetch(existing_id, connection=redis_conn).get_status()
+        except NoSuchJobError:
+            if redis_conn.ttl(marker) > marker_ttl - ENQUEUE_GRACE_SECONDS:
+                return existing_id, False
+            status = None
+        if status in ACTIVE_JOB_STATUSES:
+            return existing_id, False
+        with redis_conn.pipeline() as pipe:
+            pipe.watch(marker)
+            if pipe.get(marker) == existing:
+                pipe.multi()
+                pipe.delete(marker)
+                pipe.execute()
+    return queue.enqueue(func, *args, job_timeout=job_timeout).id, True
+
+
+def enqueue_once(key: str, func, *args, queue: Queue | None = None, job_timeout: int | None = None) -> str:
+    return try_enqueue_once(key, func, *args, queue=queue, job_timeout=job_timeout)[0]
+
+
+def singleflight_active(key: str, redis_conn: Redis | None = None) -> bool:
+    return bool((redis_conn or get_redis()).exists(_singleflight_key(key)))
@@ -1,8 +1,14 @@
+import json
 import logging
+from rq import get_current_job
+from app.core.config import settings
 from app.db.session import SessionLocal
+from app.models import Summary, SummaryVersion
 from app.services.pdf_ingestion import ingest_pdf
 from app.services.summary_service import generate_summary
 from app.services.tts_service import generate_audio
+from app.services.batch_summary import generate_book_summaries
+from app.workers.rq_queue import book_summary_progress_key, get_redis, job_stream_channel
 
 logger = logging.getLogger(__name__)
 
@@ -15,22 +21,87 @@ def ingest_pdf_job(book_id: int) -> None:
         db.close()
 
 
-def generate_summary_job(section_id: int, recursive: bool) -> int | None:
+def _job_publisher():
+    job = get_current_job()
+    if job is None:
+        return None
+    redis_conn = get_redis()
+    channel = job_stream_channel(job.id)
+
+    def publish(event: str, **data) -> None:
+        redis_conn.publish(channel, json.dumps({"event": event, **data}))
+
+    return publish
+
+
+def generate_summary_job(
+    section_id: int, recursive: bool, hierarchical: bool = False, regenerate: bool = False
+) -> int | None:
     db = SessionLocal()
+    publish = _job_publisher()
+    on_token = (lambda token: publish("token", text=token)) if publish else None
     try:
-        version, warning, overview = generate_summary(db, section_id, recursive)
+        version, warning, overview = generate_summary(
+            db, section_id, recursive, hierarchical, use_cache=not regenerate, on_token=on_token
+        )
         if warning or overview:
             logger.info("Large content warning", extra={"section_id": section_id})
-            return {"warning": warning, "overview": overview}
-        return version.id if version else None
+            result = {"warning": warning, "overview": overview}
+        else:
+            result = version.id if version else None
+        if publish:
+            publish("done", result=result)
+        return result
+    except Exception as exc:
+        if publish:
+            publish("error", detail=str(exc))
+        raise
     finally:
         db.close()
 
 
 def generate_tts_job(version_id: int) -> int:
+    job = get_current_job()
     db = SessionLocal()
     try:
-        audio = generate_audio(db, version_id)
+        audio = generate_audio(db, version_id, job.id if job else None)
         return audio.id
     finally:
         db.close()
+
+
+def prefetch_section_job(section_id: int, with_audio: bool) -> int | None:
+    db = SessionLocal()
+    try:
+        version = (
+            db.query(SummaryVersion)
+            .join(Summary, Summary.id == SummaryVersion.summary_id)
+            .filter(Summary.section_id == section_id)
+            .order_by(SummaryVersion.version_number.desc())
+            .first()
+        )
+        if version is None:
+            version, warning, _ = generate_summary(db, section_id, False)
+            if version is None:
+                logger.info("Prefetch skipped large section", extra={"section_id": section_id, "warning": warning})
+                return None
+        if with_audio:
+            job = get_current_job()
+            generate_audio(db, version.id, job.id if job else None)
+        return version.id
+    finally:
+        db.close()
+
+
+def generate_book_summaries_job(book_id: int, concurrency: int, max_age_hours: float, hierarchical: bool) -> dict:
+    redis_conn = get_redis()
+    key = book_summary_progress_key(book_id)
+
+    def report(progress: dict) -> None:
+        redis_conn.set(key, json.dumps(progress), ex=settings.batch_summary_progress_ttl)
+
+    try:
+        return generate_book_summaries(SessionLocal, book_id, concurrency, max_age_hours, hierarchical, report)
+    except Exception as exc:
+        report({"book_id": book_id, "status": "failed", "error": str(exc)})
+        raise
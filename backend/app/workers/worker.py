@@ -1,5 +1,5 @@
 import logging
-from rq import Connection, Worker
+from rq import Connection, SimpleWorker, Worker
 from redis import Redis
 from app.core.config import settings
 from app.core.logging import configure_logging
@@ -11,6 +11,8 @@ logger = logging.getLogger(__name__)
 if __name__ == "__main__":
     redis_conn = Redis.from_url(settings.redis_url)
     with Connection(redis_conn):
-        worker = Worker(["default"])
-        logger.info("Worker starting")
+        keep_piper_pool = settings.tts_backend == "piper" and settings.piper_pool_size > 0
+        worker_class = SimpleWorker if settings.rq_simple_worker or keep_piper_pool else Worker
+        worker = worker_class(["default", "low"])
+        logger.info("Worker starting", extra={"worker_class": worker_class.__name__})
         worker.work()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import tempfile
+import time
+import fitz
+from app.core.config import settings
+from app.services.image_extraction import extract_images
+from app.services.parallel_ingestion import extract_sharded
+from app.services.section_tree import extract_page_texts, find_heading_sections
+
+
+def build_pdf(path: str, pages: int, images_per_page: int) -> None:
+    doc = fitz.open()
+    for page_num in range(1, pages + 1):
+        page = doc.new_page()
+        if page_num % 20 == 1:
+            page.insert_text((72, 72), f"Chapter {page_num // 20 + 1}", fontsize=18)
+        page.insert_text((72, 110), f"Body text for page {page_num}. " * 4, fontsize=10)
+        for img_index in range(images_per_page):
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 256, 256), False)
+            pix.set_rect(pix.irect, ((page_num * 37) % 255, (img_index * 91) % 255, 128))
+            top = 140 + img_index * 140
+            page.insert_image(fitz.Rect(72, top, 272, top + 120), pixmap=pix)
+    doc.save(path)
+    doc.close()
+
+
+def run_serial(path: str, book_id: int) -> tuple[int, int]:
+    doc = fitz.open(path)
+    try:
+        headings = find_heading_sections(extract_page_texts(doc))
+        assets = extract_images(doc, book_id)
+    finally:
+        doc.close()
+    return len(headings), len(assets)
+
+
+def run_sharded(path: str, book_id: int, shard_size: int, workers: int) -> tuple[int, int]:
+    doc = fitz.open(path)
+    page_count = doc.page_count
+    doc.close()
+    page_texts, assets = extract_sharded(path, book_id, page_count, shard_size=shard_size, workers=workers)
+    return len(find_heading_sections(page_texts)), len(assets)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare serial and sharded PDF ingestion")
+    parser.add_argument("--pages", type=int, default=600)
+    parser.add_argument("--images-per-page", type=int, default=2)
+    parser.add_argument("--shard-size", type=int, default=settings.ingest_shard_size)
+    parser.add_argument("--workers", type=int, default=settings.ingest_workers or os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.image_dir = os.path.join(tmp, "images")
+        os.environ["IMAGE_DIR"] = settings.image_dir
+        pdf_path = os.path.join(tmp, "bench.pdf")
+        build_pdf(pdf_path, args.pages, args.images_per_page)
+
+        start = time.perf_counter()
+        serial = run_serial(pdf_path, 1)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sharded = run_sharded(pdf_path, 2, args.shard_size, args.workers)
+        sharded_time = time.perf_counter() - start
+
+    print(f"pages={args.pages} shard_size={args.shard_size} workers={args.workers}")
+    print(f"serial:  {serial_time:.2f}s headings={serial[0]} assets={serial[1]}")
+    print(f"sharded: {sharded_time:.2f}s headings={sharded[0]} assets={sharded[1]}")
+    if sharded_time:
+        print(f"speedup: {serial_time / sharded_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
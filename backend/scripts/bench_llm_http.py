@@ -0,0 +1,80 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from app.core.config import settings
+from app.services.llm_providers import OllamaProvider
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self) -> None:
+        super().setup()
+        with self.lock:
+            type(self).connections += 1
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps({"response": "ok"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def per_call_client(url: str, payload: dict) -> None:
+    with httpx.Client(timeout=settings.ollama_timeout) as client:
+        response = client.post(f"{url}/api/generate", json=payload)
+        response.raise_for_status()
+
+
+def run(label: str, call, requests: int, concurrency: int) -> None:
+    MockOllamaHandler.connections = 0
+    per_thread = max(1, requests // concurrency)
+
+    def worker() -> None:
+        for _ in range(per_thread):
+            call()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = per_thread * concurrency
+    print(f"{label}: {total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s), tcp connections={MockOllamaHandler.connections}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-call and pooled LLM HTTP clients against a local mock")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.ollama_url = url
+    payload = {"model": settings.ollama_model, "prompt": "ping", "stream": False}
+    provider = OllamaProvider()
+    try:
+        run("per-call client", lambda: per_call_client(url, payload), args.requests, args.concurrency)
+        run("pooled client  ", lambda: provider.generate("ping", ""), args.requests, args.concurrency)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
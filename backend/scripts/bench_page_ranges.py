@@ -0,0 +1,71 @@
+import argparse
+import random
+import time
+from app.services.section_tree import SectionNode, compute_page_ranges
+
+
+def reference_page_ranges(nodes: list[SectionNode], page_count: int) -> list[tuple[SectionNode, int, int]]:
+    ranges: list[tuple[SectionNode, int, int]] = []
+    for idx, node in enumerate(nodes):
+        start = node.page
+        end = page_count
+        for next_node in nodes[idx + 1 :]:
+            if next_node.level <= node.level:
+                end = max(start, next_node.page - 1)
+                break
+        ranges.append((node, start, end))
+    return ranges
+
+
+def random_toc(rng: random.Random, count: int, max_level: int, page_count: int) -> list[SectionNode]:
+    pages = sorted(rng.randint(1, page_count) for _ in range(count))
+    if rng.random() < 0.2:
+        rng.shuffle(pages)
+    return [SectionNode(level=rng.randint(1, max_level), title=f"S{idx}", page=page) for idx, page in enumerate(pages)]
+
+
+def check_equivalence(cases: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for case in range(cases):
+        page_count = rng.randint(1, 400)
+        nodes = random_toc(rng, rng.randint(0, 60), rng.randint(1, 6), page_count)
+        expected = reference_page_ranges(nodes, page_count)
+        actual = compute_page_ranges(nodes, page_count)
+        if actual != expected:
+            raise AssertionError(f"Mismatch on case {case}: {nodes!r}")
+    print(f"equivalence: {cases} random TOCs match the reference implementation")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check and time compute_page_ranges on deep TOCs")
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--max-level", type=int, default=4)
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    check_equivalence(args.cases, args.seed)
+
+    rng = random.Random(args.seed)
+    page_count = args.nodes // 4 + 1
+    nodes = random_toc(rng, args.nodes, args.max_level, page_count)
+    nodes[0].level = 1
+    for node in nodes[1:]:
+        node.level = max(node.level, 2)
+
+    start = time.perf_counter()
+    expected = reference_page_ranges(nodes, page_count)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = compute_page_ranges(nodes, page_count)
+    stack_time = time.perf_counter() - start
+
+    print(f"nodes={args.nodes}")
+    print(f"reference: {reference_time:.3f}s")
+    print(f"stack:     {stack_time:.3f}s")
+    print(f"identical: {actual == expected}")
+
+
+if __name__ == "__main__":
+    main()
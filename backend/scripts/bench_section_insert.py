@@ -0,0 +1,95 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Book, Section
+from app.services.pdf_ingestion import insert_section_tree
+from app.services.section_tree import SectionNode, compute_page_ranges
+
+
+def synthetic_toc(count: int, max_depth: int, seed: int) -> list[SectionNode]:
+    rng = random.Random(seed)
+    nodes: list[SectionNode] = []
+    level = 1
+    for idx in range(count):
+        level = rng.randint(1, min(max_depth, level + 1))
+        nodes.append(SectionNode(level=level, title=f"Section {idx + 1}", page=idx // 3 + 1))
+    return nodes
+
+
+def insert_per_row(db, book_id: int, ranges) -> None:
+    section_stack: list[Section] = []
+    for sort_order, (node, start, end) in enumerate(ranges, start=1):
+        while section_stack and section_stack[-1].level >= node.level:
+            section_stack.pop()
+        parent_id = section_stack[-1].id if section_stack else None
+        section = Section(
+            book_id=book_id,
+            parent_id=parent_id,
+            level=node.level,
+            title=node.title,
+            sort_order=sort_order,
+            page_start=start,
+            page_end=end,
+        )
+        db.add(section)
+        db.flush()
+        section_stack.append(section)
+
+
+def tree_shape(db, book_id: int) -> list[tuple[int, int | None]]:
+    sections = db.query(Section).filter(Section.book_id == book_id).all()
+    order_by_id = {section.id: section.sort_order for section in sections}
+    return sorted((section.sort_order, order_by_id.get(section.parent_id)) for section in sections)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-row and bulk section tree inserts")
+    parser.add_argument("--nodes", type=int, default=3000)
+    parser.add_argument("--max-depth", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, future=True)
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+        nodes = synthetic_toc(args.nodes, args.max_depth, args.seed)
+        ranges = compute_page_ranges(nodes, nodes[-1].page + 10)
+
+        db = SessionLocal()
+        try:
+            legacy_book = Book(title="legacy", file_path="")
+            bulk_book = Book(title="bulk", file_path="")
+            db.add_all([legacy_book, bulk_book])
+            db.commit()
+
+            start = time.perf_counter()
+            insert_per_row(db, legacy_book.id, ranges)
+            db.commit()
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            insert_section_tree(db, bulk_book.id, ranges)
+            db.commit()
+            bulk_time = time.perf_counter() - start
+
+            identical = tree_shape(db, legacy_book.id) == tree_shape(db, bulk_book.id)
+        finally:
+            db.close()
+            engine.dispose()
+
+    print(f"nodes={args.nodes} max_depth={args.max_depth}")
+    print(f"per-row: {legacy_time:.3f}s")
+    print(f"bulk:    {bulk_time:.3f}s")
+    print(f"identical parent_id/sort_order: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import tempfile
+import time
+import wave
+from app.core.config import settings
+from app.services.tts_service import split_tts_chunks, synthesize_text
+
+SAMPLE_PARAGRAPH = (
+    "The chapter opens with a survey of earlier work. It then introduces the central model and its assumptions. "
+    "Several worked examples show how the model behaves under load! Finally, the author lists open questions. "
+)
+
+
+def read_frames(path: str) -> bytes:
+    with wave.open(path, "rb") as wav:
+        return wav.readframes(wav.getnframes())
+
+
+def timed(label: str, text: str, path: str, chunk_chars: int, workers: int) -> float:
+    settings.tts_chunk_chars = chunk_chars
+    settings.tts_max_workers = workers
+    start = time.perf_counter()
+    synthesize_text(text, settings.tts_backend, "wav", path)
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.2f}s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare single-call and sentence-chunked parallel TTS")
+    parser.add_argument("--words", type=int, default=1500)
+    parser.add_argument("--chunk-chars", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", default="mock", choices=["mock", "piper"])
+    args = parser.parse_args()
+
+    settings.tts_backend = args.backend
+    if args.backend == "mock":
+        settings.mock_latency_ms = 300
+        settings.mock_tts_realtime_factor = 0.05
+    paragraph_words = len(SAMPLE_PARAGRAPH.split())
+    text = "\n\n".join([SAMPLE_PARAGRAPH] * max(1, args.words // paragraph_words))
+    print(f"{len(text.split())} words, {len(split_tts_chunks(text, args.chunk_chars))} chunks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = timed("single call        ", text, os.path.join(tmp, "single.wav"), 0, 1)
+        timed("chunked, sequential", text, os.path.join(tmp, "sequential.wav"), args.chunk_chars, 1)
+        parallel = timed("chunked, parallel  ", text, os.path.join(tmp, "parallel.wav"), args.chunk_chars, args.workers)
+        same = read_frames(os.path.join(tmp, "sequential.wav")) == read_frames(os.path.join(tmp, "parallel.wav"))
+        print(f"speedup vs single call: {single / parallel:.1f}x, parallel output matches sequential order: {same}")
+
+
+if __name__ == "__main__":
+    main()
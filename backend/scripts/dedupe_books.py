@@ -1,8 +1,11 @@
+import argparse
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
-from app.models import Book, Section, SectionAsset, Summary, SummaryVersion, AudioAsset, ReadingProgress
+from app.models import Book, Section, SectionAsset, Summary, SummaryVersion, AudioAsset, ReadingProgress, Note
+from app.services.pdf_ingestion import hash_file
+from app.services.page_text_store import delete_page_texts
 
 engine = create_engine(settings.database_url, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
@@ -14,17 +17,31 @@ def _safe_remove(path: str) -> None:
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Remove duplicate books that share the same PDF content")
+    parser.add_argument(
+        "--include-forced",
+        action="store_true",
+        help="also remove copies uploaded with force_reingest (they already had a content hash at upload time)",
+    )
+    args = parser.parse_args()
+
     db = SessionLocal()
     try:
         books = db.query(Book).order_by(Book.id.asc()).all()
         seen = {}
         removed = []
+        skipped = 0
         for book in books:
-            key = (book.title, book.file_path)
-            if key in seen:
+            legacy = not book.content_hash
+            if legacy and book.file_path and os.path.exists(book.file_path):
+                book.content_hash = hash_file(book.file_path)
+            key = book.content_hash or (book.title, book.file_path)
+            if key not in seen:
+                seen[key] = book.id
+            elif legacy or args.include_forced:
                 removed.append(book)
             else:
-                seen[key] = book.id
+                skipped += 1
 
         for book in removed:
             sections = db.query(Section).filter(Section.book_id == book.id).all()
@@ -45,6 +62,7 @@ def main() -> None:
                 for audio in audio_assets:
                     _safe_remove(audio.file_path)
 
+            db.query(Note).filter(Note.book_id == book.id).delete(synchronize_session=False)
             progress = db.query(ReadingProgress).filter(ReadingProgress.book_id == book.id).first()
             if progress:
                 db.delete(progress)
@@ -59,10 +77,13 @@ def main() -> None:
             db.query(Section).filter(Section.book_id == book.id).delete(synchronize_session=False)
 
             _safe_remove(book.file_path)
+            delete_page_texts(book.id)
             db.delete(book)
 
         db.commit()
         print(f"Removed {len(removed)} duplicate books")
+        if skipped:
+            print(f"Kept {skipped} copies uploaded with force_reingest; pass --include-forced to remove them")
     finally:
         db.close()
 
@@ -0,0 +1,60 @@
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+
+
+def flatten(nodes: list[dict]) -> list[dict]:
+    result = []
+    for node in nodes:
+        result.append(node)
+        result.extend(flatten(node.get("children", [])))
+    return result
+
+
+def run_one(client: httpx.Client, section_id: int, timeout: float) -> tuple[str, float]:
+    start = time.perf_counter()
+    response = client.post(f"/sections/{section_id}/summaries:generate", params={"regenerate": "true"})
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    while time.perf_counter() - start < timeout:
+        status = client.get(f"/jobs/{job_id}").json()["status"]
+        if status in ("finished", "failed"):
+            return status, time.perf_counter() - start
+        time.sleep(0.05)
+    return "timeout", time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drive summary jobs through the API and RQ; run the stack with LLM_PROVIDER=mock for stable numbers."
+    )
+    parser.add_argument("book_id", type=int)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=30) as client:
+        sections = flatten(client.get(f"/books/{args.book_id}/sections").json())
+        if not sections:
+            raise SystemExit("Book has no sections")
+        targets = [sections[index % len(sections)]["id"] for index in range(args.requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda section_id: run_one(client, section_id, args.timeout), targets))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for status, latency in results if status == "finished")
+    failures = len(results) - len(latencies)
+    print(f"requests={len(results)} finished={len(latencies)} failed={failures} wall={elapsed:.2f}s")
+    print(f"throughput={len(results) / elapsed:.2f} jobs/s")
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"latency p50={statistics.median(latencies):.3f}s p95={p95:.3f}s max={latencies[-1]:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,30 @@ import sys
 import httpx
 
 base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+book_id = sys.argv[2] if len(sys.argv) > 2 else None
+version_id = sys.argv[3] if len(sys.argv) > 3 else None
 
 resp = httpx.get(f"{base_url}/health", timeout=5)
 resp.raise_for_status()
 print("health:", resp.json())
+
+
+def check_range(path: str) -> None:
+    full = httpx.get(f"{base_url}{path}", timeout=30)
+    full.raise_for_status()
+    size = len(full.content)
+    resp = httpx.get(f"{base_url}{path}", headers={"Range": "bytes=0-1023"}, timeout=10)
+    assert resp.status_code == 206, f"{path}: expected 206, got {resp.status_code}"
+    assert len(resp.content) == min(1024, size), f"{path}: got {len(resp.content)} bytes"
+    assert resp.headers["content-range"] == f"bytes 0-{min(1023, size - 1)}/{size}", resp.headers["content-range"]
+    tail = httpx.get(f"{base_url}{path}", headers={"Range": "bytes=-100"}, timeout=10)
+    assert tail.status_code == 206 and tail.content == full.content[-100:], f"{path}: suffix range mismatch"
+    beyond = httpx.get(f"{base_url}{path}", headers={"Range": f"bytes={size}-"}, timeout=10)
+    assert beyond.status_code == 416, f"{path}: expected 416, got {beyond.status_code}"
+    print(f"range: {path} ok ({size} bytes, {resp.headers['content-type']})")
+
+
+if book_id:
+    check_range(f"/books/{book_id}/pdf")
+if version_id:
+    check_range(f"/summary_versions/{version_id}/audio")
@@ -1,6 +1,7 @@
 import os
 import time
 import base64
+import json
 import requests
 import streamlit as st
 from streamlit.components.v1 import html as components_html
@@ -146,16 +147,14 @@ def render_audio_player(audio_url: str) -> None:
         <option value="1.25">1.25x</option>
         <option value="1.5">1.5x</option>
       </select>
-      <audio id="tts-audio" controls style="width:100%;">
-        <source src="{audio_url}" type="audio/mpeg">
-      </audio>
+      <audio id="tts-audio" controls autoplay preload="auto" src="{audio_url}" style="width:100%;"></audio>
     </div>
     """
     components_html(html, height=120)
 
 
 def render_pdf_viewer(book_id: int, page: int) -> None:
-    viewer_rev = "v2-qa-1"
+    viewer_rev = "v3-qa-stream"
     viewer_url = f"{PUBLIC_BACKEND_URL}/books/{book_id}/viewer?page={page}&v={viewer_rev}"
     st.markdown(
         f"<iframe src='{viewer_url}' class='pdf-frame' style='width:100%;min-width:100%;'></iframe>",
@@ -177,6 +176,41 @@ def poll_job(job_id, timeout=60):
     return {"status": "timeout"}
 
 
+def wait_for_job_start(job_id, timeout=120):
+    start = time.time()
+    while time.time() - start < timeout:
+        res = api_get(f"/jobs/{job_id}")
+        if res and res.status_code == 200:
+            data = res.json()
+            if data.get("status") not in {"queued", "deferred", "scheduled"}:
+                return data
+        time.sleep(1)
+    return {"status": "timeout"}
+
+
+def stream_job(job_id, placeholder, timeout=120):
+    text = ""
+    try:
+        with requests.get(f"{BACKEND_URL}/jobs/{job_id}/stream", stream=True, timeout=timeout) as res:
+            if res.status_code == 200:
+                event = None
+                for line in res.iter_lines(decode_unicode=True):
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data = json.loads(line[len("data:"):].strip())
+                        if event == "token":
+                            text += data.get("text", "")
+                            placeholder.text(text)
+                        elif event == "done":
+                            return {"status": "finished", "result": data.get("result")}
+                        elif event == "error":
+                            return {"status": "failed", "result": None}
+    except requests.RequestException:
+        pass
+    return poll_job(job_id, timeout=timeout)
+
+
 def render_tree(nodes, on_click, level=0):
     for node in nodes:
         prefix = "· " * level
@@ -235,7 +269,11 @@ def summary_dialog(section, recursive):
         if cols[0].button("Regenerate"):
             res = api_post(
                 f"/sections/{section['id']}/summaries:generate",
-                params={"recursive": str(recursive).lower()},
+                params={
+                    "recursive": str(recursive).lower(),
+                    "hierarchical": str(st.session_state.get("hierarchical_summary", False)).lower(),
+                    "regenerate": str(bool(labels)).lower(),
+                },
             )
             if not res:
                 st.error("Backend unavailable.")
@@ -246,7 +284,7 @@ def summary_dialog(section, recursive):
 
         if st.session_state.get("regen_in_progress") and st.session_state.get("regen_job_id"):
             with st.spinner("Generating summary..."):
-                result = poll_job(st.session_state["regen_job_id"], timeout=120)
+                result = stream_job(st.session_state["regen_job_id"], st.empty(), timeout=120)
             st.session_state["regen_in_progress"] = False
             st.session_state["regen_job_id"] = None
             if result.get("result"):
@@ -271,27 +309,23 @@ def summary_dialog(section, recursive):
         audio_urls = st.session_state.get("audio_urls", {})
 
         if cols[2].button("Listen") and selected_version_id:
-            if st.session_state.get("tts_in_progress"):
-                st.info("Audio generation in progress...")
+            res = api_post(f"/summary_versions/{selected_version_id}/tts")
+            if not res:
+                st.error("Backend unavailable.")
+                return
+            job_id = res.json().get("job_id")
+            st.session_state["last_tts_job_id"] = job_id
+            with st.spinner("Waiting for audio generation to start..."):
+                job = wait_for_job_start(job_id)
+            if job.get("status") in {"failed", "timeout", "not_found"}:
+                st.error("Audio generation failed.")
             else:
-                st.session_state["tts_in_progress"] = True
-                res = api_post(f"/summary_versions/{selected_version_id}/tts")
-                if not res:
-                    st.error("Backend unavailable.")
-                    st.session_state["tts_in_progress"] = False
-                    return
-                job_id = res.json().get("job_id")
-                st.session_state["last_tts_job_id"] = job_id
-                with st.spinner("Generating audio..."):
-                    result = poll_job(job_id, timeout=120)
-                if result.get("status") == "finished":
-                    audio_url = (
-                        f"{PUBLIC_BACKEND_URL}/summary_versions/{selected_version_id}/audio"
-                        f"?ts={int(time.time())}"
-                    )
-                    audio_urls[str(selected_version_id)] = audio_url
-                    st.session_state["audio_urls"] = audio_urls
-                st.session_state["tts_in_progress"] = False
+                audio_url = (
+                    f"{PUBLIC_BACKEND_URL}/summary_versions/{selected_version_id}/audio/stream"
+                    f"?job_id={job_id}&ts={int(time.time())}"
+                )
+                audio_urls[str(selected_version_id)] = audio_url
+                st.session_state["audio_urls"] = audio_urls
 
         audio_url = audio_urls.get(str(selected_version_id)) if selected_version_id else None
         if audio_url:
@@ -369,6 +403,11 @@ selected_label = st.sidebar.selectbox(
     key="selected_book_label",
 )
 st.sidebar.checkbox("Recursive summary", value=st.session_state.get("recursive_summary", True), key="recursive_summary")
+st.sidebar.checkbox(
+    "Build from subsection summaries",
+    value=st.session_state.get("hierarchical_summary", False),
+    key="hierarchical_summary",
+)
 
 tabs = st.tabs(["Reader", "Summaries Explorer"])
 
@@ -407,7 +446,34 @@ if selected_label != "None":
                     st.rerun()
                 else:
                     st.error("Delete failed.")
-    if not st.session_state.get("show_summary") and not st.session_state.get("tts_in_progress"):
+
+    with st.sidebar.expander("Summarize whole book"):
+        batch_concurrency = st.number_input("Concurrent sections", min_value=1, max_value=16, value=2)
+        if st.button("Summarize all sections"):
+            res = api_post(
+                f"/books/{book['id']}/summaries:generate_all",
+                params={
+                    "concurrency": int(batch_concurrency),
+                    "hierarchical": str(st.session_state.get("hierarchical_summary", False)).lower(),
+                },
+            )
+            if not res or res.status_code != 200:
+                st.error("Failed to start batch summarization.")
+        batch = api_get(f"/books/{book['id']}/summaries:progress")
+        batch_data = batch.json() if batch and batch.status_code == 200 else {}
+        if batch_data.get("status") in ("running", "finished"):
+            total = batch_data.get("total") or 0
+            done = batch_data.get("done", 0)
+            st.progress(done / total if total else 1.0, text=f"{done}/{total} sections")
+            if batch_data["status"] == "running" and batch_data.get("eta_seconds") is not None:
+                st.caption(f"About {int(batch_data['eta_seconds'])}s remaining")
+            if batch_data.get("skipped_fresh"):
+                st.caption(f"{batch_data['skipped_fresh']} sections already up to date")
+            if batch_data.get("failed"):
+                st.warning(f"{batch_data['failed']} sections failed")
+        elif batch_data.get("status") == "failed":
+            st.error(batch_data.get("error") or "Batch summarization failed.")
+    if not st.session_state.get("show_summary"):
         st_autorefresh(interval=1000, key="summary_autorefresh", debounce=True)
     progress = api_get(f"/books/{book['id']}/progress")
     last_page = progress.json().get("last_page", 1) if progress and progress.status_code == 200 else 1